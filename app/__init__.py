@@ -2,11 +2,22 @@ from flask import Flask
 from flask_cors import CORS
 import os
 # Import models, blueprints, and anything else needed to set up the app or database
-from flasgger import Swagger
-from .models import board, card
+from .models import board, card, card_change
+from . import search
+from .apidocs import init_apidocs
 from .db import db, migrate
+from .cache import init_cache
+from .cli import boards_cli
+from .events import init_event_broker
+from .json_provider import init_json_provider
+from .likes import init_like_buffer
+from .pool import engine_options, env_int, init_pool_metrics
+from .profiler import init_query_profiler
+from .replicas import STICKY_HEADER, init_replicas, replica_binds
 from .routes.board_routes import bp as board_bp
 from .routes.card_routes import bp as cards_bp
+from .routes.metrics_routes import bp as metrics_bp
+from .routes.search_routes import bp as search_bp
 
 
 def create_app(config=None):
@@ -14,28 +25,89 @@ def create_app(config=None):
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SQLALCHEMY_DATABASE_URI')
+    # Connection pool per worker process; ignored for SQLite (see app/pool.py)
+    app.config['DB_POOL_SIZE'] = env_int('DB_POOL_SIZE', 5)
+    app.config['DB_MAX_OVERFLOW'] = env_int('DB_MAX_OVERFLOW', 10)
+    app.config['DB_POOL_TIMEOUT'] = env_int('DB_POOL_TIMEOUT', 30)
+    app.config['DB_POOL_RECYCLE'] = env_int('DB_POOL_RECYCLE', 1800)
+    app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'true') == 'true'
+    # Postgres statement_timeout in milliseconds; unset means no limit
+    app.config['DB_STATEMENT_TIMEOUT_MS'] = env_int('DB_STATEMENT_TIMEOUT_MS', None)
+    # Comma-separated read replica URIs for GET requests (see app/replicas.py)
+    app.config['SQLALCHEMY_REPLICA_URIS'] = [
+        uri.strip() for uri in os.environ.get('SQLALCHEMY_REPLICA_URIS', '').split(',') if uri.strip()
+    ]
+    # Seconds a failing replica is skipped, and seconds a client reads the primary after a write
+    app.config['REPLICA_RETRY_SECONDS'] = 30
+    app.config['REPLICA_STICKY_SECONDS'] = 5
+    # Per-request query counts and DB time in Server-Timing, plus a slow request log (see app/profiler.py)
+    app.config['QUERY_PROFILING'] = os.environ.get('QUERY_PROFILING') == 'true'
+    app.config['SLOW_REQUEST_MS'] = env_int('SLOW_REQUEST_MS', 500)
+    app.config['SLOW_REQUEST_QUERIES'] = 3
+    # Page sizes for keyset-paginated list endpoints
+    app.config['DEFAULT_PAGE_SIZE'] = 100
+    app.config['MAX_PAGE_SIZE'] = 500
+    # Rows fetched per round trip when a list endpoint is streamed with ?stream=true
+    app.config['STREAM_BATCH_SIZE'] = 1000
+    # Most items accepted by one request to a /batch endpoint
+    app.config['MAX_BATCH_SIZE'] = 1000
+    # Cards written per INSERT by /boards/import and `flask boards import`
+    app.config['IMPORT_CHUNK_SIZE'] = 1000
+    # Buffer likes in memory and write them in batches (see app/likes.py)
+    app.config['LIKE_BUFFERING'] = os.environ.get('LIKE_BUFFERING') == 'true'
+    app.config['LIKE_FLUSH_THRESHOLD'] = 100
+    app.config['LIKE_FLUSH_INTERVAL'] = 1.0
+    # Response cache for GET endpoints: "memory", "redis" or "none" (see app/cache.py)
+    app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+    app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL')
+    app.config['CACHE_TTL'] = 60
+    app.config['CACHE_MAX_ENTRIES'] = 1024
+    # Board event streams: "memory" (one process) or "redis" (all workers), see app/events.py
+    app.config['EVENT_BROKER'] = os.environ.get('EVENT_BROKER', 'memory')
+    app.config['EVENT_REDIS_URL'] = os.environ.get('EVENT_REDIS_URL')
+    app.config['SSE_BUFFER_SIZE'] = 100
+    app.config['SSE_HEARTBEAT_SECONDS'] = 15
+    # JSON encoder: "orjson", "stdlib", or "auto" for orjson when it is installed (see app/json_provider.py)
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'auto')
+    # List endpoints read plain column rows ("core") or ORM instances ("orm")
+    app.config['READ_PATH'] = os.environ.get('READ_PATH', 'core')
+    # /apidocs; "false" skips loading flasgger at all, e.g. in production workers (see app/apidocs.py)
+    app.config['SWAGGER_ENABLED'] = os.environ.get('SWAGGER_ENABLED', 'true') == 'true'
 
     if config:
         app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(app.config))
     # Swagger UI info
     # default APIDOCS route endpoint is /apidocs
     # http://127.0.0.1:5000/apidocs/
-    
     app.config['SWAGGER'] = {
         "title": "Inspiration Board API",
         "uiversion": 3,
         "description": "API for managing boards and cards with likes and assignments"
     }
 
+    init_json_provider(app)
+
     # Initialize app with SQLAlchemy db and Migrate
-    Swagger(app)
+    init_apidocs(app)
 
     db.init_app(app)
     migrate.init_app(app, db)
+    init_pool_metrics(app)
+    init_replicas(app)
+    init_query_profiler(app)
+    init_like_buffer(app)
+    init_cache(app)
+    init_event_broker(app)
 
     # Register Blueprints 
     app.register_blueprint(board_bp)
     app.register_blueprint(cards_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(metrics_bp)
+    app.cli.add_command(boards_cli)
 
-    CORS(app)
+    # Cross-origin clients can only echo the header back if they can read it
+    CORS(app, expose_headers=[STICKY_HEADER])
     return app
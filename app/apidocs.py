@@ -0,0 +1,32 @@
+import os
+import sys
+
+
+def swag_from(specs):
+    """Attach a Swagger YAML file to a view, like flasgger's ``swag_from``.
+
+    Only sets the attributes flasgger reads when it builds the spec, so route
+    modules don't import flasgger. Relative paths are resolved from the view's
+    module, also under other decorators (``functools.wraps`` keeps
+    ``__module__``).
+    """
+    def decorator(view):
+        module_dir = os.path.dirname(sys.modules[view.__module__].__file__)
+        view.swag_path = os.path.normpath(os.path.join(module_dir, specs))
+        view.swag_type = "yml"
+        return view
+    return decorator
+
+
+def init_apidocs(app):
+    """Serve /apidocs and /apispec_1.json when SWAGGER_ENABLED is on.
+
+    flasgger is imported here rather than at module level, so workers and
+    tests that turn it off never load it. The spec itself is built on the
+    first /apispec_1.json request and kept in memory after that.
+    """
+    if not app.config["SWAGGER_ENABLED"]:
+        return
+
+    from flasgger import Swagger
+    Swagger(app)
@@ -0,0 +1,188 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, g, make_response, request
+
+
+class CacheBackend:
+    """Storage used by ResponseCache.
+
+    Entries expire after their TTL and may be evicted at any time. Counters
+    hold the tag versions and must not be evicted, otherwise an old entry could
+    become valid again.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def get_counters(self, keys):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, keys):
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Backend shared by all workers, wrapping a redis-py compatible client."""
+
+    def __init__(self, client, prefix="inspiration-board:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def get_counters(self, keys):
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [int(value or 0) for value in values]
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """Caches GET responses and invalidates them by tag.
+
+    Every cached response is stored under its URL plus the current version of
+    each of its tags, e.g. ``board:3``. Writes bump the versions of the tags
+    they affect, so the old entries are never looked up again and simply
+    expire. Versions are read before the view runs and bumped after the write
+    commits, so a response rendered from old data is never stored under a
+    newer version. That only holds for reads from the primary: responses
+    rendered on a lagging replica (``g.read_replica``) are not stored, and
+    clients reading their own writes (``g.read_primary``) skip the lookup.
+    """
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get_or_render(self, tags, render):
+        versions = self.backend.get_counters([f"tag:{tag}" for tag in tags])
+        version_key = ",".join(f"{tag}={version}" for tag, version in zip(tags, versions))
+        key = f"response:{request.full_path}|{version_key}"
+
+        cached_response = None if g.get("read_primary") else self.backend.get(key)
+        if cached_response is not None:
+            data, status, headers = cached_response
+            response = Response(data, status, headers)
+            response.headers["X-Cache"] = "HIT"
+            # Cached responses keep their ETag, so revalidation can still end in a 304
+            return response.make_conditional(request)
+
+        response = make_response(render())
+        if response.status_code == 200 and not response.is_streamed and g.get("read_replica") is None:
+            headers = [(name, value) for name, value in response.headers if name != "X-Cache"]
+            self.backend.set(key, (response.get_data(), response.status_code, headers), self.ttl)
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def invalidate(self, *tags):
+        for tag in set(tags):
+            self.backend.incr(f"tag:{tag}")
+
+
+def normalize_id(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def cached(tags):
+    """Cache a GET view under the tags returned by ``tags(**view_args)``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            response_cache = current_app.extensions.get("response_cache")
+            if not response_cache:
+                return view(**view_args)
+
+            # Tag "board:01" and "board:1" alike so writes invalidate both URLs
+            tag_args = {name: normalize_id(value) for name, value in view_args.items()}
+            return response_cache.get_or_render(tags(**tag_args), lambda: view(**view_args))
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """Drop cached responses carrying any of ``tags``. Call after committing."""
+    response_cache = current_app.extensions.get("response_cache")
+    if response_cache:
+        response_cache.invalidate(*tags)
+
+
+def init_cache(app):
+    backend_name = app.config["CACHE_BACKEND"]
+    if backend_name == "memory":
+        backend = MemoryBackend(max_entries=app.config["CACHE_MAX_ENTRIES"])
+    elif backend_name == "redis":
+        import redis
+        backend = RedisBackend(redis.Redis.from_url(app.config["CACHE_REDIS_URL"]))
+    elif backend_name == "none":
+        return
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND {backend_name!r}")
+
+    app.extensions["response_cache"] = ResponseCache(backend, ttl=app.config["CACHE_TTL"])
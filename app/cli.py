@@ -0,0 +1,75 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .cache import invalidate
+from .routes.helpers import compact_card_changes, reconcile_board_counts
+from .transfer import PARSERS, WRITERS, TransferError, export_records, import_records
+
+boards_cli = AppGroup("boards", help="Bulk maintenance of boards and their cards.")
+
+
+def invalidate_server_cache(*tags):
+    """Invalidate ``tags`` in the response cache the web workers read.
+
+    Only a shared backend (CACHE_BACKEND=redis) reaches them from this
+    process; the memory backend is private to each process, so the workers
+    keep serving their entries until CACHE_TTL expires.
+    """
+    invalidate(*tags)
+    if current_app.config["CACHE_BACKEND"] == "memory":
+        click.echo(
+            "Warning: CACHE_BACKEND=memory is private to each process, so running servers may serve "
+            f"stale responses for up to {current_app.config['CACHE_TTL']}s",
+            err=True
+        )
+
+
+@boards_cli.command("export")
+@click.argument("output", type=click.File("w", encoding="utf-8"), default="-")
+@click.option("--format", "transfer_format", type=click.Choice(list(WRITERS)), default="ndjson")
+def export_command(output, transfer_format):
+    """Write every board and its cards to OUTPUT (default: stdout)."""
+    records = export_records(batch_size=current_app.config["STREAM_BATCH_SIZE"])
+    for fragment in WRITERS[transfer_format](records):
+        output.write(fragment)
+
+
+@boards_cli.command("import")
+@click.argument("source", type=click.File("rb"))
+@click.option("--format", "transfer_format", type=click.Choice(list(PARSERS)), default=None,
+              help="Defaults to csv for .csv files and ndjson otherwise.")
+def import_command(source, transfer_format):
+    """Load boards and cards from an export file."""
+    if transfer_format is None:
+        transfer_format = "csv" if source.name.endswith(".csv") else "ndjson"
+
+    try:
+        result = import_records(
+            PARSERS[transfer_format](source), chunk_size=current_app.config["IMPORT_CHUNK_SIZE"]
+        )
+    except TransferError as e:
+        raise click.ClickException(str(e))
+    invalidate_server_cache("boards", "cards")
+
+    click.echo(
+        f"Imported {result['boards']} board(s) and {result['cards']} card(s) "
+        f"in {result['seconds']}s ({result['rows_per_second']} rows/sec)"
+    )
+
+
+@boards_cli.command("reconcile")
+def reconcile_command():
+    """Recompute every board's card_count and likes_total from its cards."""
+    board_ids = reconcile_board_counts()
+    invalidate_server_cache("boards", *(f"board:{board_id}" for board_id in board_ids))
+    if board_ids:
+        click.echo(f"Fixed counts on {len(board_ids)} board(s): {', '.join(map(str, board_ids))}")
+    else:
+        click.echo("All board counts are correct")
+
+
+@boards_cli.command("compact-changes")
+def compact_changes_command():
+    """Drop card changes that a later change of the same card supersedes."""
+    removed = compact_card_changes()
+    click.echo(f"Removed {removed} superseded card change(s)")
@@ -1,6 +1,36 @@
+import sqlite3
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from .models.base import Base
 
-db = SQLAlchemy(model_class=Base)
-migrate = Migrate()
\ No newline at end of file
+
+class RoutingSession(Session):
+    """Session that sends the queries of read-only requests to a replica.
+
+    app/replicas.py picks a replica engine for each GET request and stores it
+    in ``g.read_replica``. Flushes and every other request use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get("read_replica")
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+migrate = Migrate()
+
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys, ON DELETE CASCADE included, when each connection asks
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
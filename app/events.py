@@ -0,0 +1,134 @@
+import json
+import threading
+from collections import deque
+from flask import current_app
+
+
+class Subscription:
+    """Bounded buffer of events for one subscriber.
+
+    When a slow consumer lets the buffer fill up, the oldest events are dropped
+    and counted so the stream can tell the client to reload instead of growing
+    without limit.
+    """
+
+    def __init__(self, channel, max_events):
+        self.channel = channel
+        self.dropped = 0
+        self._events = deque(maxlen=max_events)
+        self._ready = threading.Condition()
+
+    def put(self, event):
+        with self._ready:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout):
+        """Wait up to ``timeout`` seconds and return all buffered events, oldest first."""
+        with self._ready:
+            if not self._events:
+                self._ready.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class EventBroker:
+    """Fans events out to the subscriptions of a channel in this process."""
+
+    def __init__(self, max_events=100):
+        self.max_events = max_events
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.max_events)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+class RedisEventBroker(EventBroker):
+    """Broker that shares events between workers through Redis pub/sub.
+
+    Events are published to Redis, and one listener thread per process
+    delivers them to the local subscriptions.
+    """
+
+    def __init__(self, client, max_events=100, prefix="inspiration-board:events:"):
+        super().__init__(max_events)
+        self.client = client
+        self.prefix = prefix
+        self._listener = None
+
+    def subscribe(self, channel):
+        if self._listener is None:
+            self._start_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, event):
+        self.client.publish(self.prefix + channel, json.dumps(event))
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(f"{self.prefix}*")
+            self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True)
+            self._listener.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self.deliver(channel[len(self.prefix):], json.loads(message["data"]))
+
+
+def board_channel(board_id):
+    return f"board:{board_id}"
+
+
+def publish_board_event(board_id, event_type, data):
+    """Send an event to everyone following a board. Call after committing."""
+    event = {"type": event_type, "board_id": board_id, **data}
+    current_app.extensions["event_broker"].publish(board_channel(board_id), event)
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def init_event_broker(app):
+    broker_name = app.config["EVENT_BROKER"]
+    if broker_name == "memory":
+        broker = EventBroker(max_events=app.config["SSE_BUFFER_SIZE"])
+    elif broker_name == "redis":
+        import redis
+        broker = RedisEventBroker(
+            redis.Redis.from_url(app.config["EVENT_REDIS_URL"]),
+            max_events=app.config["SSE_BUFFER_SIZE"]
+        )
+    else:
+        raise ValueError(f"Unknown EVENT_BROKER {broker_name!r}")
+
+    app.extensions["event_broker"] = broker
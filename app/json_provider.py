@@ -0,0 +1,67 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, plus SQLAlchemy rows serialized as objects.
+
+    Views can return rows straight from ``db.session.execute`` instead of
+    building ORM instances and calling ``to_dict`` on each one.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Row):
+            return o._asdict()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(JSONProvider):
+    """Encodes with orjson, decoding to the same values as the stdlib provider.
+
+    Keys are sorted like Flask's default and datetimes are still written as
+    HTTP dates. The bytes do differ for non-ASCII text: orjson writes it as
+    UTF-8 where the stdlib escapes it (``é`` as ``\\u00e9``), so such titles
+    and messages get a shorter body and Content-Length.
+    """
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Pretty-printing is for debugging; let the stdlib provider indent
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options()) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {"stdlib": JSONProvider, "orjson": OrjsonProvider}
+
+
+def init_json_provider(app):
+    provider_name = app.config["JSON_PROVIDER"]
+    if provider_name == "auto":
+        provider_name = "orjson" if orjson else "stdlib"
+    if provider_name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON_PROVIDER {provider_name!r}")
+    if provider_name == "orjson" and not orjson:
+        raise ValueError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+
+    app.json = JSON_PROVIDERS[provider_name](app)
@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from sqlalchemy import bindparam, update
+from .cache import invalidate
+from .db import db
+from .models.card import Card
+from .routes.helpers import record_card_changes, touch_boards
+
+
+class LikeBuffer:
+    """Coalesces like increments in memory and writes them in batches.
+
+    Each flush turns all pending likes into one executemany UPDATE that adds
+    the per-card delta, so a burst of likes on a hot card costs a single row
+    write instead of one per like. Likes are flushed once ``flush_threshold``
+    are pending or ``flush_interval`` seconds have passed since the last flush.
+
+    Given an ``app``, a daemon thread flushes every ``flush_interval`` seconds
+    so the tail of a burst is written without waiting for another like. It is
+    started by the first like in each process, so forked workers get their own.
+    """
+
+    def __init__(self, flush_threshold=100, flush_interval=1.0, app=None):
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.app = app
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher_pid = None
+
+    def add(self, card_id):
+        """Record one like and return the number of likes pending for the card."""
+        with self._lock:
+            self._pending[card_id] += 1
+            card_pending = self._pending[card_id]
+            flush_due = (
+                self._pending.total() >= self.flush_threshold
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if flush_due:
+            self.flush()
+        else:
+            self._start_flusher()
+
+        return card_pending
+
+    def _start_flusher(self):
+        # Threads don't survive fork, so a worker forked from a preloaded app starts its own
+        if self.app is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name="like-flusher", daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                flush_due = self._pending and time.monotonic() - self._last_flush >= self.flush_interval
+            if not flush_due:
+                continue
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    # The batch was re-queued; the next tick retries it
+                    self.app.logger.exception("Flushing buffered likes failed")
+
+    def pending(self, card_id):
+        with self._lock:
+            return self._pending[card_id]
+
+    def flush(self):
+        """Write all pending likes to the database and return how many were written."""
+        with self._lock:
+            batch = self._pending
+            self._pending = Counter()
+            self._last_flush = time.monotonic()
+
+        if not batch:
+            return 0
+
+        card_table = Card.__table__
+        query = (
+            update(card_table)
+            .where(card_table.c.id == bindparam("card_id"))
+            .values(likes_count=card_table.c.likes_count + bindparam("delta"))
+        )
+        try:
+            db.session.execute(query, [
+                {"card_id": card_id, "delta": delta} for card_id, delta in batch.items()
+            ])
+            card_boards = dict(db.session.execute(
+                db.select(Card.id, Card.board_id).where(Card.id.in_(batch))
+            ).all())
+            # Cards deleted since they were liked have no board to count the likes on
+            likes_by_board = Counter()
+            for card_id, delta in batch.items():
+                if card_id in card_boards:
+                    likes_by_board[card_boards[card_id]] += delta
+            counts = {board_id: (0, likes) for board_id, likes in likes_by_board.items()}
+            touch_boards(*card_boards.values(), counts=counts)
+            record_card_changes((board_id, card_id) for card_id, board_id in card_boards.items())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the likes back so the next flush retries them
+            with self._lock:
+                self._pending.update(batch)
+            raise
+
+        board_ids = set(card_boards.values())
+        invalidate(
+            "boards",
+            "cards",
+            *(f"card:{card_id}" for card_id in batch),
+            *(f"board:{board_id}" for board_id in board_ids),
+            *(f"board:{board_id}:cards" for board_id in board_ids)
+        )
+        return batch.total()
+
+
+def init_like_buffer(app):
+    if not app.config.get("LIKE_BUFFERING"):
+        return
+
+    like_buffer = LikeBuffer(
+        flush_threshold=app.config["LIKE_FLUSH_THRESHOLD"],
+        flush_interval=app.config["LIKE_FLUSH_INTERVAL"],
+        app=app
+    )
+    app.extensions["like_buffer"] = like_buffer
+
+    def flush_on_exit():
+        with app.app_context():
+            like_buffer.flush()
+
+    atexit.register(flush_on_exit)
@@ -1,4 +1,14 @@
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# The trigram indexes used for ilike substring filters need the pg_trgm extension.
+# Other databases skip those indexes and fall back to a scan.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
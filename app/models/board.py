@@ -1,3 +1,5 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from ..db import db
 from typing import TYPE_CHECKING, List
@@ -9,23 +11,53 @@ if TYPE_CHECKING:
 class Board(db.Model):
 # So SQLAlchemy handle the table vs. manually
     __tablename__ = "board"
+    __table_args__ = (
+        # Trigram index for title substring search (Postgres only, see app/models/base.py)
+        Index(
+            "ix_board_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(nullable=False)
     owner: Mapped[str] = mapped_column(nullable=False)
-    cards: Mapped[List["Card"]] = relationship(back_populates="board", cascade="all, delete")
-
-    def to_dict(self):
-        return { 
-            "id" : self.id,
-            "title": self.title,
-            "owner": self.owner
-        }
-    
-    def to_dict_with_cards(self):
+    # Bumped whenever the board or any of its cards changes; used for ETags
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now(), server_default=func.now()
+    )
+    # Kept in step with the board's cards by touch_boards; `flask boards reconcile` repairs drift
+    card_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    likes_total: Mapped[int] = mapped_column(default=0, server_default="0")
+    cards: Mapped[List["Card"]] = relationship(
+        back_populates="board", cascade="all, delete", passive_deletes=True, order_by="Card.id"
+    )
+
+    # Every field a response can ask for with ?fields=, in response order
+    FIELDS = ("id", "title", "owner", "card_count", "likes_total")
+
+    def to_dict(self, fields=FIELDS):
+        return {field: getattr(self, field) for field in fields}
+
+    def to_dict_with_cards(self, card_fields=None, compact=False, cards=None):
+        """Board fields plus its cards, optionally limited to ``card_fields``.
+
+        ``compact`` drops each card's board_id, which repeats the board's id,
+        and returns the cards as one array per field. ``cards`` replaces the
+        loaded relationship, e.g. with a sorted or top-N subset.
+        """
+        from .card import Card
+
         board_dict = self.to_dict()
-        board_dict["cards"] = [card.to_dict() for card in self.cards]
-        return board_dict 
+        card_fields = card_fields or Card.FIELDS
+        cards = self.cards if cards is None else cards
+        if compact:
+            fields = [field for field in card_fields if field != "board_id"]
+            board_dict["cards"] = Card.to_columns(cards, fields)
+        else:
+            board_dict["cards"] = [card.to_dict(card_fields) for card in cards]
+        return board_dict
 
     @classmethod
     def from_dict(cls, dict_data_board):
@@ -34,8 +66,10 @@ class Board(db.Model):
             owner=dict_data_board["owner"]
         )
 
+    @staticmethod
+    def changes_from_dict(dict_data_board):
+        return {field: dict_data_board[field] for field in ("title", "owner") if field in dict_data_board}
+
     def update_from_dict(self, dict_data_board):
-        if "title" in dict_data_board:
-            self.title = dict_data_board["title"]
-        if "owner" in dict_data_board:
-            self.owner = dict_data_board["owner"]
\ No newline at end of file
+        for field, value in self.changes_from_dict(dict_data_board).items():
+            setattr(self, field, value)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy import Integer, String, ForeignKey, DateTime
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Index
 from datetime import datetime
 from typing import TYPE_CHECKING
 from ..db import db
@@ -10,11 +10,19 @@ if TYPE_CHECKING:
 class Card(db.Model):
     # So SQLAlchemy handle the table vs. manually
     __tablename__ = "card"
+    __table_args__ = (
+        # Trigram index for message substring search (Postgres only, see app/models/base.py)
+        Index(
+            "ix_card_message_trgm", "message",
+            postgresql_using="gin", postgresql_ops={"message": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     message: Mapped[str] = mapped_column(String(40), nullable=False)
     likes_count: Mapped[int] = mapped_column(Integer, default=0)
-    board_id: Mapped[int] = mapped_column(ForeignKey("board.id"))
+    # The database deletes a board's cards with it (Board.cards uses passive_deletes)
+    board_id: Mapped[int] = mapped_column(ForeignKey("board.id", ondelete="CASCADE"), index=True)
     board: Mapped["Board"] = relationship(back_populates="cards")
 
     @validates("message")
@@ -25,13 +33,16 @@ class Card(db.Model):
             raise ValueError("The message field shouldn't be greater than 40 characters")
         return message
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "message": self.message,
-            "likes_count": self.likes_count,
-            "board_id": self.board_id
-        }
+    # Every field a response can ask for with ?fields=, in response order
+    FIELDS = ("id", "message", "likes_count", "board_id")
+
+    def to_dict(self, fields=FIELDS):
+        return {field: getattr(self, field) for field in fields}
+
+    @staticmethod
+    def to_columns(cards, fields=FIELDS):
+        # Compact form: one array per field instead of one object per card
+        return {field: [getattr(card, field) for card in cards] for field in fields}
 
     @classmethod
     def from_dict(cls, dict_data_card):
@@ -41,6 +52,24 @@ class Card(db.Model):
             likes_count=dict_data_card["likes_count"] if "likes_count" in dict_data_card else 0
         )
 
+    @classmethod
+    def changes_from_dict(cls, dict_data_card):
+        if "message" not in dict_data_card:
+            return {}
+        # Building a Card runs validate_message on the new message
+        return {"message": cls(message=dict_data_card["message"]).message}
+
     def update_from_dict(self, dict_data_card):
         if "message" in dict_data_card:
-            self.message = dict_data_card["message"]
\ No newline at end of file
+            self.message = dict_data_card["message"]
+
+
+# Most liked cards first: per board for sorted and top-N board reads, and
+# across all boards for the /cards/top leaderboard. On Postgres the board index
+# also carries the message so those reads can be index-only scans.
+Index(
+    "ix_card_board_id_likes_count_id", Card.board_id, Card.likes_count.desc(), Card.id,
+    postgresql_include=["message"]
+)
+Index("ix_card_likes_count_id", Card.likes_count.desc(), Card.id)
+
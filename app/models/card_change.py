@@ -0,0 +1,24 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from ..db import db
+
+
+class CardChange(db.Model):
+    """A card that changed on a board, and the board version it changed at.
+
+    GET /boards/<board_id>/changes reads the cards' current rows, so a change
+    only records which card to look at: one still on the board is sent as an
+    upsert, one that is gone as a tombstone. `flask boards compact-changes`
+    keeps only the latest change of each card.
+    """
+    __tablename__ = "card_change"
+    __table_args__ = (
+        Index("ix_card_change_board_id_version", "board_id", "version"),
+    )
+
+    # Increases with every change; the primary key doubles as the log sequence
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    board_id: Mapped[int] = mapped_column(ForeignKey("board.id", ondelete="CASCADE"))
+    version: Mapped[int]
+    # Not a foreign key: the row outlives a deleted card as its tombstone
+    card_id: Mapped[int]
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from .db import db
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Counters for one worker's connection pool.
+
+    Every gunicorn worker has its own pool, so these describe the pool of the
+    process that answers the request; scrape each worker to size pools.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.connections_opened = 0
+        self.overflow_connections = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds, timed_out=False):
+        milliseconds = seconds * 1000
+        bucket = next(
+            (index for index, bound in enumerate(WAIT_BUCKETS_MS) if milliseconds <= bound), len(WAIT_BUCKETS_MS)
+        )
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bucket] += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def on_connect(self, pool):
+        with self._lock:
+            self.connections_opened += 1
+            # QueuePool counts overflow up from -pool_size, so a positive value means past the pool size
+            if isinstance(pool, QueuePool) and pool.overflow() > 0:
+                self.overflow_connections += 1
+
+    def on_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def on_invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip((*map(str, WAIT_BUCKETS_MS), "+Inf"), self.wait_buckets):
+                cumulative += count
+                buckets[bound] = cumulative
+            data = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "connections_opened": self.connections_opened,
+                "overflow_connections": self.overflow_connections,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "count": self.wait_count,
+                    "total": round(self.wait_total * 1000, 3),
+                    "max": round(self.wait_max * 1000, 3),
+                    "buckets": buckets,
+                },
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), checked_in=pool.checkedin(), overflow=max(pool.overflow(), 0))
+        return data
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection.
+
+    Pool events fire only once a connection has been handed out, so the wait
+    itself has to be measured around ``connect``.
+    """
+
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, "") else int(value)
+
+
+def engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings.
+
+    SQLite keeps SQLAlchemy's defaults: its pools don't take these sizes and
+    it has no statement timeout.
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if not uri or uri.startswith("sqlite"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    statement_timeout = config["DB_STATEMENT_TIMEOUT_MS"]
+    if statement_timeout and uri.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
+def init_pool_metrics(app):
+    metrics = PoolMetrics()
+    with app.app_context():
+        engine = db.engine
+
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    # Listeners on the engine carry over to pools recreated by dispose()
+    event.listen(engine, "connect", lambda dbapi_connection, record: metrics.on_connect(engine.pool))
+    event.listen(engine, "checkout", lambda dbapi_connection, record, proxy: metrics.on_checkout())
+    event.listen(engine, "checkin", lambda dbapi_connection, record: metrics.on_checkin())
+    event.listen(engine, "invalidate", lambda dbapi_connection, record, exception: metrics.on_invalidate())
+
+    app.extensions["pool_metrics"] = metrics
+
+
+def dispose_after_fork(app):
+    """Drop the pooled connections a forked worker inherited from its parent.
+
+    ``close=False`` leaves the sockets alone so the parent's connections keep
+    working; the worker opens its own on first use. See gunicorn.conf.py.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,121 @@
+import heapq
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from .db import db
+
+
+class QueryProfile:
+    """The statements one request (or one test block) sent, with their times."""
+
+    def __init__(self):
+        self.queries = []
+
+    def record(self, statement, seconds):
+        self.queries.append((seconds, statement))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def seconds(self):
+        return sum(seconds for seconds, _ in self.queries)
+
+    def slowest(self, count):
+        return heapq.nlargest(count, self.queries, key=lambda query: query[0])
+
+
+def listen_for_queries(engine, on_query):
+    """Call ``on_query(statement, seconds)`` after each statement on engine.
+
+    Returns a function that removes the listeners again.
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        on_query(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    def remove():
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+    return remove
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Fail with an AssertionError when the block sends more than max_queries statements.
+
+    Needs an app context; counts statements on every engine of the app.
+    """
+    profile = QueryProfile()
+    removers = [listen_for_queries(engine, profile.record) for engine in db.engines.values()]
+    try:
+        yield profile
+    finally:
+        for remove in removers:
+            remove()
+
+    if profile.count > max_queries:
+        statements = "\n".join(statement for _, statement in profile.queries)
+        raise AssertionError(f"{profile.count} queries over a budget of {max_queries}:\n{statements}")
+
+
+def add_server_timing(response, *metrics):
+    # Server-Timing takes a comma-separated list, so keep what the view already set
+    existing = response.headers.get("Server-Timing")
+    response.headers["Server-Timing"] = ", ".join(filter(None, (existing, *metrics)))
+
+
+def init_query_profiler(app):
+    """Report each request's query count and database time when QUERY_PROFILING is on.
+
+    Responses get a Server-Timing header, and requests slower than
+    SLOW_REQUEST_MS are logged with their slowest statements. Streamed
+    bodies run their queries after the response is built, so only the
+    queries before the first chunk are counted.
+    """
+    if not app.config["QUERY_PROFILING"]:
+        return
+
+    def on_query(statement, seconds):
+        profile = g.get("query_profile") if has_app_context() else None
+        if profile is not None:
+            profile.record(statement, seconds)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            listen_for_queries(engine, on_query)
+
+    @app.before_request
+    def start_query_profile():
+        g.query_profile = QueryProfile()
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def report_query_profile(response):
+        profile = g.pop("query_profile", None)
+        if profile is None:
+            return response
+
+        request_ms = (time.perf_counter() - g.pop("request_start")) * 1000
+        db_ms = profile.seconds * 1000
+        add_server_timing(
+            response, f'db;dur={db_ms:.2f};desc="{profile.count} queries"', f"app;dur={request_ms:.2f}"
+        )
+
+        if request_ms >= app.config["SLOW_REQUEST_MS"]:
+            slowest = "".join(
+                f"\n  {seconds * 1000:.2f}ms {statement}"
+                for seconds, statement in profile.slowest(app.config["SLOW_REQUEST_QUERIES"])
+            )
+            app.logger.warning(
+                "Slow request %s %s: %.2fms, %d queries in %.2fms%s",
+                request.method, request.full_path.rstrip("?"), request_ms, profile.count, db_ms, slowest
+            )
+        return response
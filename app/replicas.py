@@ -0,0 +1,120 @@
+import itertools
+import threading
+import time
+from flask import current_app, g, request
+from sqlalchemy import event, exc
+from .db import db
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Sent after a write and echoed back by the client, so it also works cross-origin where cookies aren't sent
+STICKY_HEADER = "Read-Primary-Until"
+
+
+class ReplicaSet:
+    """Round-robin choice between replica engines, skipping unhealthy ones.
+
+    A replica that fails to connect or drops its connection is skipped for
+    ``retry_seconds``; when none is healthy, reads go to the primary.
+    """
+
+    def __init__(self, engines, retry_seconds=30):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = {engine: 0.0 for engine in engines}
+        self._reads = {engine: 0 for engine in engines}
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def pick(self):
+        now = time.monotonic()
+        with self._lock:
+            for _ in self.engines:
+                engine = self.engines[next(self._turns) % len(self.engines)]
+                if self._down_until[engine] <= now:
+                    self._reads[engine] += 1
+                    return engine
+        return None
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_seconds
+
+    def _on_error(self, context):
+        # No connection means it couldn't connect; is_disconnect means it lost one
+        if context.connection is None or context.is_disconnect:
+            self.mark_down(context.engine)
+            # Flags the raised error's connection_invalidated, which is what fails the read over
+            context.is_disconnect = True
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._down_until[engine] <= now,
+                "reads": self._reads[engine],
+            } for engine in self.engines]
+
+
+def replica_binds(config):
+    # Each replica URI becomes a Flask-SQLAlchemy bind named replica_<n>
+    return {f"replica_{index}": uri for index, uri in enumerate(config["SQLALCHEMY_REPLICA_URIS"])}
+
+
+def sticky_until():
+    # A client can only pin its own reads, and for no longer than a write would
+    try:
+        until = float(request.headers.get(STICKY_HEADER, ""))
+    except ValueError:
+        return None
+    remaining = until - time.time()
+    return until if 0 < remaining <= current_app.config["REPLICA_STICKY_SECONDS"] else None
+
+
+def init_replicas(app):
+    """Send GET requests to the replicas in SQLALCHEMY_REPLICA_URIS.
+
+    A successful write answers with a Read-Primary-Until header. Reads that
+    echo it back go to the primary until then, so the writer sees its own
+    write. Other clients may see replica lag. Responses rendered on a replica
+    are never stored in the response cache.
+    """
+    bind_keys = list(replica_binds(app.config))
+    if not bind_keys:
+        return
+
+    with app.app_context():
+        replicas = ReplicaSet(
+            [db.engines[bind_key] for bind_key in bind_keys], retry_seconds=app.config["REPLICA_RETRY_SECONDS"]
+        )
+    app.extensions["replicas"] = replicas
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method not in READ_METHODS:
+            return
+        if sticky_until():
+            # The response cache skips its lookup too, since an entry may predate the write
+            g.read_primary = True
+        else:
+            g.read_replica = replicas.pick()
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            response.headers[STICKY_HEADER] = f"{time.time() + app.config['REPLICA_STICKY_SECONDS']:.3f}"
+        return response
+
+    @app.errorhandler(exc.DBAPIError)
+    def retry_read_on_primary(error):
+        # A replica that went away mid-request: serve this read from the primary.
+        # Other errors, e.g. a statement timeout, would fail on the primary too
+        replica = g.pop("read_replica", None)
+        if replica is None or not error.connection_invalidated:
+            raise error
+        replicas.mark_down(replica)
+        db.session.rollback()
+        return current_app.view_functions[request.endpoint](**request.view_args)
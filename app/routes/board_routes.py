@@ -1,49 +1,83 @@
-from flask import Blueprint, request, Response, jsonify
+import hashlib
+from flask import Blueprint, abort, current_app, request, Response, jsonify, make_response, stream_with_context
 from app.models.board import Board
 from app.models.card import Card
-from app.routes.helpers import validate_model, create_model
+from app.models.card_change import CardChange
+from app.routes.helpers import (
+    abort_not_found, check_not_modified, chunked, create_model, delete_model, field_columns, find_cards, get_batch,
+    keyset_window, model_changes, paginate, parse_card_sort, parse_fields, parse_model_id, parse_query_int, parse_top,
+    record_card_changes, select_fields, set_validators, sort_order, stream_json, stream_rows, tally_cards, to_output,
+    touch_boards, update_model, validate_batch, validate_model, wants_compact, wants_stream
+)
+from ..transfer import PARSERS, WRITERS, TransferError, export_records, import_records
+from ..cache import cached, invalidate
 from ..db import db
-from flasgger import swag_from
+from ..events import board_channel, format_sse, publish_board_event
+from ..apidocs import swag_from
+from sqlalchemy.orm import load_only, selectinload
 
 bp = Blueprint("board_bp", __name__, url_prefix="/boards")
 
+
+def board_etag(board_id, version):
+    return f"board-{board_id}-v{version}"
+
+
 @bp.post("")
 @swag_from("../../docs/boards/create_board.yml")
 def create_board():
     request_body = request.get_json()
-    return create_model(Board, request_body)
+    response = create_model(Board, request_body)
+    invalidate("boards")
+    return response
 
 
 @bp.get("")
 @swag_from("../../docs/boards/get_all_boards.yml")
+@cached(lambda: ["boards"])
 def get_all_boards():
-    query = db.select(Board)
+    fields = parse_fields(Board)
+    # Only the requested columns are selected
+    query = select_fields(Board, fields)
     title_param = request.args.get("title")
 
     if title_param:
         query = query.where(Board.title.ilike(f"%{title_param}%"))
 
-    boards = db.session.scalars(query.order_by(Board.id))
-    boards_response = [board.to_dict() for board in boards]
-    return boards_response
+    if wants_stream():
+        return stream_rows(Board, query.with_only_columns(*field_columns(Board, fields)))
+
+    boards, headers = paginate(Board, query)
+    boards_response = to_output(boards, fields)
+    return boards_response, 200, headers
 
 
 @bp.get("/<board_id>")
 @swag_from("../../docs/boards/get_one_board.yml")
+@cached(lambda board_id: [f"board:{board_id}"])
 def get_one_board(board_id):
     board = validate_model(Board, board_id)
+    etag = board_etag(board.id, board.version)
+    check_not_modified(etag, board.updated_at)
 
-    return jsonify({"board": board.to_dict()})
+    return set_validators(jsonify({"board": board.to_dict()}), etag, board.updated_at)
 
 
 @bp.put("/<board_id>")
 @swag_from("../../docs/boards/update_board.yml")
 def update_board(board_id):
-    board = validate_model(Board, board_id)
-    request_body = request.get_json()
-
-    board.update_from_dict(request_body)
+    changes = model_changes(Board, request.get_json())
+    if not changes:
+        # Nothing to write, so the version and ETag stay as they were
+        update_model(Board, board_id, changes, Board.id)
+        return Response(status=204, mimetype="application/json")
+
+    # Bumps the version like touch_boards, in the same statement as the change
+    changes.update(version=Board.version + 1, updated_at=db.func.now())
+    board = update_model(Board, board_id, changes, *field_columns(Board, Board.FIELDS))
     db.session.commit()
+    invalidate("boards", f"board:{board.id}")
+    publish_board_event(board.id, "board.updated", {"board": dict(board._mapping)})
 
     return Response(status=204, mimetype="application/json")
 
@@ -51,66 +85,375 @@ def update_board(board_id):
 @bp.delete("/<board_id>")
 @swag_from("../../docs/boards/delete_board.yml")
 def delete_board(board_id):
-    board = validate_model(Board, board_id)
-    db.session.delete(board)
+    # ON DELETE CASCADE removes the cards, and one tag drops their cached GET /cards/<card_id>
+    # responses, so the cost doesn't grow with the number of cards
+    board_id = delete_model(Board, board_id, Board.id).id
     db.session.commit()
+    invalidate("boards", "cards", f"board:{board_id}", f"board:{board_id}:cards", "deleted-boards")
+    publish_board_event(board_id, "board.deleted", {})
 
     return Response(status=204, mimetype="application/json")
 
 
 @bp.get("/<board_id>/cards")
 @swag_from("../../docs/boards/get_cards_by_board.yml")
+@cached(lambda board_id: [f"board:{board_id}", f"board:{board_id}:cards"])
 def get_cards_by_board(board_id):
-    board = validate_model(Board, board_id)
-
-    return board.to_dict_with_cards()
+    board_id = parse_model_id(Board, board_id)
+    sort_column, descending = parse_card_sort()
+    top = parse_top()
+    card_fields, compact = parse_fields(Card), wants_compact()
+    card_columns = field_columns(Card, card_fields)
+
+    # Answer conditional requests from the board row alone, before touching the cards
+    board = db.session.scalar(db.select(Board).where(Board.id == board_id))
+    if not board:
+        abort_not_found(Board, board_id)
+
+    etag = board_etag(board_id, board.version)
+    check_not_modified(etag, board.updated_at)
+
+    # Only the cards are left to read; sorted and top-N reads walk ix_card_board_id_likes_count_id
+    query = (
+        db.select(Card)
+        .where(Card.board_id == board_id)
+        .options(load_only(*card_columns))
+        .order_by(*sort_order(Card, sort_column, descending))
+        .limit(top)
+    )
+    board_dict = board.to_dict_with_cards(card_fields, compact, cards=db.session.scalars(query).all())
+    return set_board_version(set_validators(jsonify(board_dict), etag, board.updated_at), board)
+
+
+def set_board_version(response, board):
+    # Where a client starts GET /boards/<board_id>/changes?since= from
+    response.headers["Board-Version"] = str(board.version)
+    return response
+
+
+@bp.get("/<board_id>/changes")
+@swag_from("../../docs/boards/get_board_changes.yml")
+@cached(lambda board_id: [f"board:{board_id}", f"board:{board_id}:cards"])
+def get_board_changes(board_id):
+    board_id = parse_model_id(Board, board_id)
+    since = parse_query_int("since", None)
+    if since is None:
+        return {"message": "Query parameter since is required"}, 400
+
+    query = db.select(*field_columns(Board, Board.FIELDS), Board.version).where(Board.id == board_id)
+    board = db.session.execute(query).one_or_none()
+    if not board:
+        abort_not_found(Board, board_id)
+
+    # Each changed card once, found through ix_card_change_board_id_version
+    changed_ids = (
+        db.select(CardChange.card_id)
+        .where(CardChange.board_id == board_id, CardChange.version > since)
+        .distinct()
+        .subquery()
+    )
+    # The cards' current rows decide: still on the board is an upsert, gone is a tombstone
+    query = (
+        db.select(changed_ids.c.card_id.label("changed_id"), *field_columns(Card, Card.FIELDS))
+        .outerjoin(Card, db.and_(Card.id == changed_ids.c.card_id, Card.board_id == board_id))
+        .order_by(changed_ids.c.card_id)
+    )
+    cards, deleted_card_ids = [], []
+    for row in db.session.execute(query):
+        if row.id is None:
+            deleted_card_ids.append(row.changed_id)
+        else:
+            cards.append({field: getattr(row, field) for field in Card.FIELDS})
+
+    board_dict = {field: getattr(board, field) for field in Board.FIELDS}
+    return {"board": board_dict, "version": board.version, "cards": cards, "deleted_card_ids": deleted_card_ids}
 
 
 @bp.get("/with-cards")
 @swag_from("../../docs/boards/get_all_boards_with_cards.yml")
+@cached(lambda: ["boards", "cards"])
 def get_all_boards_with_cards():
-    query = db.select(Board).order_by(Board.id)
-    boards = db.session.scalars(query).all()
-
-    boards_with_cards = [board.to_dict_with_cards() for board in boards]
-
-    return boards_with_cards, 200
+    card_fields, compact = parse_fields(Card), wants_compact()
+    if wants_stream():
+        return stream_boards_with_cards(card_fields, compact)
+
+    # Page through board versions first so an unchanged page costs one small query
+    query = db.select(Board.id, Board.version)
+    board_versions, headers = paginate(Board, query)
+
+    # ETag only: deleting a board changes the page's ids but no surviving board's updated_at,
+    # so a Last-Modified from the page would answer If-Modified-Since with a stale 304
+    etag = hashlib.sha1(
+        ",".join(f"{board.id}:{board.version}" for board in board_versions).encode()
+    ).hexdigest()
+    check_not_modified(etag)
+
+    board_ids = [board.id for board in board_versions]
+    if current_app.config["READ_PATH"] == "orm":
+        # selectinload fetches every board's cards in one extra query instead of one per board
+        query = (
+            db.select(Board)
+            .where(Board.id.in_(board_ids))
+            .options(selectinload(Board.cards).load_only(*field_columns(Card, card_fields)))
+            .order_by(Board.id)
+        )
+        boards_with_cards = [
+            board.to_dict_with_cards(card_fields, compact) for board in db.session.scalars(query)
+        ]
+    else:
+        boards_with_cards = boards_with_card_rows(board_ids, card_fields, compact)
+
+    response = make_response(boards_with_cards, 200, headers)
+    return set_validators(response, etag)
+
+
+def boards_with_card_rows(board_ids, card_fields, compact):
+    """Build board dicts with their cards straight from two column queries.
+
+    Skips ORM instances and per-card ``to_dict`` calls; each card is a dict
+    zipped from its row, or with ``compact`` a column of per-field arrays.
+    """
+    if compact:
+        card_fields = [field for field in card_fields if field != "board_id"]
+
+    card_query = (
+        db.select(Card.board_id, *field_columns(Card, card_fields))
+        .where(Card.board_id.in_(board_ids))
+        .order_by(Card.board_id, Card.id)
+    )
+    card_values = {}
+    for board_id, *values in db.session.execute(card_query):
+        card_values.setdefault(board_id, []).append(values)
+
+    board_query = db.select(*field_columns(Board, Board.FIELDS)).where(Board.id.in_(board_ids)).order_by(Board.id)
+    boards = []
+    for board in db.session.execute(board_query):
+        board_dict = board._asdict()
+        values = card_values.get(board.id, [])
+        if compact:
+            board_dict["cards"] = {field: [card[i] for card in values] for i, field in enumerate(card_fields)}
+        else:
+            board_dict["cards"] = [dict(zip(card_fields, card)) for card in values]
+        boards.append(board_dict)
+
+    return boards
+
+
+def stream_boards_with_cards(card_fields=Card.FIELDS, compact=False):
+    """Stream boards with their cards from one ordered join, one row at a time.
+
+    Compact boards are written whole, since their card arrays are per field.
+    """
+    board_ids = keyset_window(Board, db.select(Board.id)).subquery()
+    # Select only the requested card columns; the card id is always needed to spot boards without cards
+    card_keys = {"id": "card_id", "board_id": "id"}
+    card_columns = [
+        getattr(Card, field).label(f"card_{field}") for field in card_fields if field not in card_keys
+    ]
+    query = (
+        db.select(*field_columns(Board, Board.FIELDS), Card.id.label("card_id"), *card_columns)
+        .join(board_ids, board_ids.c.id == Board.id)
+        .outerjoin(Card, Card.board_id == Board.id)
+        .order_by(Board.id, Card.id)
+        .execution_options(yield_per=current_app.config["STREAM_BATCH_SIZE"])
+    )
+    rows = db.session.execute(query)
+    if compact:
+        card_fields = [field for field in card_fields if field != "board_id"]
+    card_keys = [card_keys.get(field, f"card_{field}") for field in card_fields]
+
+    def generate():
+        dumps = current_app.json.dumps
+        board = None
+        yield "["
+        for row in rows:
+            row = row._mapping
+            if board is None or row["id"] != board["id"]:
+                if board is not None:
+                    yield dumps(board) + "," if compact else "]},"
+                board = {field: row[field] for field in Board.FIELDS}
+                if compact:
+                    board["cards"] = {field: [] for field in card_fields}
+                else:
+                    # Open the board object and leave its cards array open
+                    yield dumps(board)[:-1] + ', "cards": ['
+                    first_card = True
+            if row["card_id"] is not None:
+                values = [row[key] for key in card_keys]
+                if compact:
+                    for field, value in zip(card_fields, values):
+                        board["cards"][field].append(value)
+                else:
+                    yield ("" if first_card else ",") + dumps(dict(zip(card_fields, values)))
+                    first_card = False
+        if board is not None:
+            yield dumps(board) if compact else "]}"
+        yield "]"
+
+    return stream_json(generate())
+
+
+TRANSFER_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def get_transfer_format(default):
+    transfer_format = request.args.get("format", default)
+    if transfer_format not in TRANSFER_MIMETYPES:
+        response = {"message": f"Format must be one of: {', '.join(TRANSFER_MIMETYPES)}"}
+        abort(make_response(response, 400))
+    return transfer_format
+
+
+@bp.get("/export")
+@swag_from("../../docs/boards/export_boards.yml")
+def export_boards():
+    transfer_format = get_transfer_format("ndjson")
+    records = export_records(batch_size=current_app.config["STREAM_BATCH_SIZE"])
+    body = chunked(WRITERS[transfer_format](records))
+
+    response = Response(stream_with_context(body), mimetype=TRANSFER_MIMETYPES[transfer_format])
+    response.headers["Content-Disposition"] = f"attachment; filename=boards.{transfer_format}"
+    return response
+
+
+@bp.post("/import")
+@swag_from("../../docs/boards/import_boards.yml")
+def import_boards():
+    transfer_format = get_transfer_format("csv" if request.mimetype == "text/csv" else "ndjson")
+    # Read the body as it arrives instead of loading the whole upload into memory
+    records = PARSERS[transfer_format](request.stream)
+
+    try:
+        result = import_records(records, chunk_size=current_app.config["IMPORT_CHUNK_SIZE"])
+    except TransferError as e:
+        return {"message": str(e)}, 400
+
+    invalidate("boards", "cards")
+    return result, 201
 
 
 @bp.post("/<board_id>/cards")
 @swag_from("../../docs/boards/create_card_for_board.yml")
 def create_card_for_board(board_id):
-    validate_model(Board, board_id)
+    board_id = validate_model(Board, board_id).id
     request_body = request.get_json()
-    request_body["board_id"] = int(board_id)
+    request_body["board_id"] = board_id
+    touch_boards(board_id, counts={board_id: (1, request_body.get("likes_count", 0))})
+
+    card_response, status = create_model(
+        Card, request_body, before_commit=lambda card: record_card_changes([(board_id, card.id)])
+    )
+    invalidate("boards", "cards", f"board:{board_id}", f"board:{board_id}:cards")
+    publish_board_event(board_id, "card.created", {"card": card_response})
+    return card_response, status
+
+
+@bp.post("/<board_id>/cards/batch")
+@swag_from("../../docs/boards/create_cards_batch.yml")
+def create_cards_batch(board_id):
+    board_id = validate_model(Board, board_id).id
+    items = get_batch(request.get_json(), "cards")
+    new_cards = validate_batch(items, lambda item: Card.from_dict({**item, "board_id": board_id}))
+
+    # One multi-row INSERT for the whole batch, with the returned rows in request order
+    query = db.insert(Card).returning(
+        Card.id, Card.message, Card.likes_count, Card.board_id, sort_by_parameter_order=True
+    )
+    rows = db.session.execute(query, [
+        {"message": card.message, "likes_count": card.likes_count, "board_id": board_id}
+        for card in new_cards
+    ])
+    cards_response = [row._asdict() for row in rows]
+    touch_boards(counts=tally_cards((board_id, card["likes_count"]) for card in cards_response))
+    record_card_changes((board_id, card["id"]) for card in cards_response)
+    db.session.commit()
+
+    invalidate("boards", "cards", f"board:{board_id}", f"board:{board_id}:cards")
+    for card in cards_response:
+        publish_board_event(board_id, "card.created", {"card": card})
 
-    return create_model(Card, request_body)
+    return {"cards": cards_response}, 201
 
 
 @bp.post("/<board_id>/cards/assign")
 @swag_from("../../docs/boards/reassign_cards_to_board.yml")
 def reassign_cards_to_board(board_id):
-    board = validate_model(Board, board_id)
+    board_id = validate_model(Board, board_id).id
     request_body = request.get_json()
     card_ids = request_body.get("card_ids", [])
 
     if not card_ids:
         return {"message": "Request must include a list of card_ids"}, 400
 
-    updated_cards = []
-    for card_id in card_ids:
-        card = validate_model(Card, card_id)
-        previous_board = card.board_id
-        card.board_id = board.id 
-        updated_cards.append({
-            "card_id": card.id,
-            "from_board": previous_board,
-            "to_board": board.id
-        })
-
+    card_ids = list(dict.fromkeys(parse_model_id(Card, card_id) for card_id in card_ids))
+
+    # Validate every id in one query and lock the rows we are about to move
+    cards = find_cards(card_ids, lock=True)
+    previous_boards = {card_id: card.board_id for card_id, card in cards.items()}
+
+    db.session.execute(db.update(Card).where(Card.id.in_(card_ids)).values(board_id=board_id))
+    # Take the cards off their old boards' counts and add them to the new board's
+    counts = tally_cards(((card.board_id, card.likes_count) for card in cards.values()), sign=-1)
+    moved_cards, moved_likes = counts.get(board_id, (0, 0))
+    counts[board_id] = (moved_cards + len(cards), moved_likes + sum(card.likes_count for card in cards.values()))
+    touch_boards(counts=counts)
+    # A tombstone on the old board and an upsert on the new one
+    record_card_changes([
+        *((previous_board_id, card_id) for card_id, previous_board_id in previous_boards.items()),
+        *((board_id, card_id) for card_id in card_ids)
+    ])
     db.session.commit()
+    invalidate(
+        "boards",
+        "cards",
+        *(f"board:{affected_id}" for affected_id in {board_id, *previous_boards.values()}),
+        *(f"board:{affected_id}:cards" for affected_id in {board_id, *previous_boards.values()}),
+        *(f"card:{card_id}" for card_id in card_ids)
+    )
+
+    updated_cards = [{
+        "card_id": card_id,
+        "from_board": previous_boards[card_id],
+        "to_board": board_id
+    } for card_id in card_ids]
+
+    for affected_id in {board_id, *previous_boards.values()}:
+        moves = [move for move in updated_cards if affected_id in (move["from_board"], move["to_board"])]
+        publish_board_event(affected_id, "card.reassigned", {"reassigned_cards": moves})
 
     return {
-        "message": f"Moved {len(updated_cards)} card(s) to board {board.id}",
+        "message": f"Moved {len(updated_cards)} card(s) to board {board_id}",
         "reassigned_cards": updated_cards
     }, 200
+
+
+@bp.get("/<board_id>/events")
+@swag_from("../../docs/boards/stream_board_events.yml")
+def stream_board_events(board_id):
+    board_id = validate_model(Board, board_id).id
+    # The stream can stay open for hours; don't hold a database connection for it
+    db.session.close()
+
+    broker = current_app.extensions["event_broker"]
+    subscription = broker.subscribe(board_channel(board_id))
+    heartbeat = current_app.config["SSE_HEARTBEAT_SECONDS"]
+
+    def generate():
+        yield "retry: 3000\n\n"
+        reported_drops = 0
+        while True:
+            events = subscription.get(timeout=heartbeat)
+            if subscription.dropped > reported_drops:
+                # The client fell behind and missed events; it should reload the board
+                yield format_sse({"type": "overflow", "board_id": board_id, "dropped": subscription.dropped})
+                reported_drops = subscription.dropped
+            if not events:
+                yield ": keep-alive\n\n"
+            for event in events:
+                yield format_sse(event)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(lambda: broker.unsubscribe(subscription))
+    return response
@@ -1,29 +1,68 @@
-from flask import Blueprint, request, Response, jsonify
-from flasgger import swag_from
+from flask import Blueprint, current_app, request, Response, jsonify
+from ..apidocs import swag_from
+from ..cache import cached, invalidate
 from ..db import db
+from ..events import publish_board_event
 from ..models.board import Board
 from ..models.card import Card
-from .helpers import validate_model
+from .helpers import (
+    abort_cards_not_found, delete_model, fetch_all, field_columns, find_card_boards, get_batch, model_changes,
+    paginate, parse_card_sort, parse_fields, parse_model_id, parse_query_int, parse_top, record_card_changes,
+    select_fields, sort_order, stream_rows, tally_cards, to_output, touch_boards, update_model, validate_batch,
+    validate_model, wants_stream
+)
 
 
 bp = Blueprint("cards_bp", __name__, url_prefix="/cards")
 
 @bp.get("")
 @swag_from("../../docs/cards/get_all_cards.yml")
+@cached(lambda: ["cards"])
 def get_all_cards():
-    query = db.select(Card)
+    fields = parse_fields(Card)
+    sort_column, descending = parse_card_sort()
+    # Only the requested columns are selected, plus the sort column for the page cursor
+    query = select_fields(Card, fields, sort_column)
     message_param = request.args.get("message")
 
     if message_param:
         query = query.where(Card.message.ilike(f"%{message_param}%"))
 
-    cards = db.session.scalars(query.order_by(Card.id))
-    cards_response = [card.to_dict() for card in cards]
-    return cards_response
+    top = parse_top()
+    if top:
+        cards = fetch_all(query.order_by(*sort_order(Card, sort_column, descending)).limit(top))
+        return to_output(cards, fields)
+
+    if wants_stream():
+        return stream_rows(Card, query.with_only_columns(*field_columns(Card, fields)), sort_column, descending)
+
+    cards, headers = paginate(Card, query, sort_column, descending)
+    cards_response = to_output(cards, fields)
+    return cards_response, 200, headers
+
+
+@bp.get("/top")
+@swag_from("../../docs/cards/get_top_cards.yml")
+@cached(lambda: ["cards", "boards"])
+def get_top_cards():
+    limit = parse_query_int("limit", 10)
+    limit = max(1, min(limit, current_app.config["MAX_PAGE_SIZE"]))
+
+    # Reads the first rows of ix_card_likes_count_id, however many cards there are
+    query = (
+        db.select(Card.id, Card.message, Card.likes_count, Card.board_id, Board.title.label("board_title"))
+        .join(Board, Board.id == Card.board_id)
+        .order_by(Card.likes_count.desc(), Card.id)
+        .limit(limit)
+    )
+    # The JSON provider writes rows as objects, so no dicts are built here
+    return db.session.execute(query).all()
 
 
 @bp.get("/<card_id>")
 @swag_from("../../docs/cards/get_one_card.yml")
+# The board isn't known before the lookup, so a board delete drops every card's entry through "deleted-boards"
+@cached(lambda card_id: [f"card:{card_id}", "deleted-boards"])
 def get_one_card(card_id):
     card = validate_model(Card, card_id)
 
@@ -34,22 +73,32 @@ def get_one_card(card_id):
 @bp.put("/<card_id>")
 @swag_from("../../docs/cards/update_card.yml")
 def update_card_on_board(card_id):
-    card = validate_model(Card, card_id)
+    changes = model_changes(Card, request.get_json())
+    card = update_model(Card, card_id, changes, *field_columns(Card, Card.FIELDS))
+    if not changes:
+        # Only the existence check ran: the board's version and the change log stay as they were
+        return Response(status=204, mimetype="application/json")
 
-    request_body = request.get_json()
-    card.update_from_dict(request_body)
+    touch_boards(card.board_id)
+    record_card_changes([(card.board_id, card.id)])
 
     db.session.commit()
+    invalidate("cards", f"board:{card.board_id}", f"card:{card.id}", f"board:{card.board_id}:cards")
+    publish_board_event(card.board_id, "card.updated", {"card": dict(card._mapping)})
     return Response(status=204, mimetype="application/json")
 
 
 @bp.delete("/<card_id>")
 @swag_from("../../docs/cards/delete_card.yml")
 def delete_card(card_id):
-    card = validate_model(Card, card_id)
+    card = delete_model(Card, card_id, Card.id, Card.board_id, Card.likes_count)
+    card_id, board_id = card.id, card.board_id
 
-    db.session.delete(card)
+    touch_boards(board_id, counts={board_id: (-1, -card.likes_count)})
+    record_card_changes([(board_id, card_id)])
     db.session.commit()
+    invalidate("boards", "cards", f"board:{board_id}", f"card:{card_id}", f"board:{board_id}:cards")
+    publish_board_event(board_id, "card.deleted", {"card_id": card_id})
 
     return Response(status=204, mimetype="application/json")
 
@@ -57,9 +106,87 @@ def delete_card(card_id):
 @bp.patch("/<card_id>/like")
 @swag_from("../../docs/cards/like_card.yml")
 def like_card(card_id):
-    card = validate_model(Card, card_id)
+    like_buffer = current_app.extensions.get("like_buffer")
+    if like_buffer:
+        card = validate_model(Card, card_id)
+        card_response = card.to_dict()
+        card_response["likes_count"] += like_buffer.add(card.id)
+        publish_board_event(card.board_id, "card.liked", {"card": card_response})
+        return card_response
+
+    # Increment in the database so concurrent likes can't overwrite each other
+    card = update_model(Card, card_id, {"likes_count": Card.likes_count + 1}, *field_columns(Card, Card.FIELDS))
+    card_id = card.id
+
+    touch_boards(card.board_id, counts={card.board_id: (0, 1)})
+    record_card_changes([(card.board_id, card_id)])
+    db.session.commit()
+    invalidate("boards", "cards", f"board:{card.board_id}", f"card:{card_id}", f"board:{card.board_id}:cards")
+    card_response = dict(card._mapping)
+    publish_board_event(card.board_id, "card.liked", {"card": card_response})
+    return card_response
+
+
+@bp.patch("/batch")
+@swag_from("../../docs/cards/update_cards_batch.yml")
+def update_cards_batch():
+    items = get_batch(request.get_json(), "cards")
+
+    def build_update(item):
+        # The message is required here, and validated like PUT /cards/<card_id> does
+        changes = Card.changes_from_dict({"message": item["message"]})
+        return {"id": parse_model_id(Card, item["id"]), **changes}
+
+    updates = validate_batch(items, build_update)
+    card_boards = find_card_boards([update["id"] for update in updates])
+
+    # Bulk UPDATE by primary key, sent as one executemany
+    db.session.execute(db.update(Card), updates)
+    touch_boards(*card_boards.values())
+    record_card_changes((board_id, card_id) for card_id, board_id in card_boards.items())
+    db.session.commit()
 
-    card.likes_count += 1
+    board_ids = set(card_boards.values())
+    invalidate(
+        "cards",
+        *(f"card:{card_id}" for card_id in card_boards),
+        *(f"board:{board_id}" for board_id in board_ids),
+        *(f"board:{board_id}:cards" for board_id in board_ids)
+    )
+    cards_response = [{**update, "board_id": card_boards[update["id"]]} for update in updates]
+    for card in cards_response:
+        publish_board_event(card["board_id"], "card.updated", {"card": card})
+
+    return {"cards": cards_response}, 200
+
+
+@bp.delete("/batch")
+@swag_from("../../docs/cards/delete_cards_batch.yml")
+def delete_cards_batch():
+    items = get_batch(request.get_json(), "card_ids")
+    card_ids = list(dict.fromkeys(parse_model_id(Card, card_id) for card_id in items))
+
+    query = db.delete(Card).where(Card.id.in_(card_ids)).returning(Card.id, Card.board_id, Card.likes_count)
+    deleted_cards = db.session.execute(query).all()
+    card_boards = {card.id: card.board_id for card in deleted_cards}
+
+    missing_ids = [card_id for card_id in card_ids if card_id not in card_boards]
+    if missing_ids:
+        db.session.rollback()
+        abort_cards_not_found(missing_ids)
+
+    touch_boards(counts=tally_cards(((card.board_id, card.likes_count) for card in deleted_cards), sign=-1))
+    record_card_changes((board_id, card_id) for card_id, board_id in card_boards.items())
     db.session.commit()
 
-    return card.to_dict()
+    invalidate(
+        "boards",
+        "cards",
+        *(f"card:{card_id}" for card_id in card_boards),
+        *(f"board:{board_id}" for board_id in set(card_boards.values())),
+        *(f"board:{board_id}:cards" for board_id in set(card_boards.values()))
+    )
+    for card_id, board_id in card_boards.items():
+        publish_board_event(board_id, "card.deleted", {"card_id": card_id})
+
+    return {"deleted_card_ids": card_ids}, 200
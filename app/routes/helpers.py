@@ -1,24 +1,40 @@
-from flask import abort, make_response
+from datetime import timezone
+from flask import Response, abort, current_app, make_response, request, stream_with_context, url_for
+from sqlalchemy import bindparam
+from sqlalchemy.orm import load_only
+from werkzeug.http import is_resource_modified
 from ..db import db
+from ..models.board import Board
+from ..models.card import Card
+from ..models.card_change import CardChange
 
-def validate_model(cls, model_id):
+def parse_model_id(cls, model_id):
     try:
-        model_id = int(model_id)
+        return int(model_id)
     except:
         response = {"message": f"{cls.__name__} {model_id} is invalid"}
         abort(make_response(response, 400))
 
-    query = db.select(cls).where(cls.id == model_id)
+
+def abort_not_found(cls, model_id):
+    response = {"message": f"{cls.__name__} {model_id} not found"}
+    abort(make_response(response, 404))
+
+
+def validate_model(cls, model_id, *options):
+    model_id = parse_model_id(cls, model_id)
+
+    query = db.select(cls).where(cls.id == model_id).options(*options)
     model = db.session.scalar(query)
 
     if not model:
-        response = {"message": f"{cls.__name__} {model_id} not found"}
-        abort(make_response(response, 404))
+        abort_not_found(cls, model_id)
 
     return model
 
 
-def create_model(cls, model_data):
+def create_model(cls, model_data, before_commit=None):
+    # before_commit(new_model) runs after the INSERT, for writes that belong in the same transaction
     try:
         new_model = cls.from_dict(model_data)
         
@@ -30,6 +46,481 @@ def create_model(cls, model_data):
         abort(make_response(response, 400))
     
     db.session.add(new_model)
+    # Build the response after the INSERT but before commit expires the instance,
+    # so reading it back doesn't cost another SELECT
+    db.session.flush()
+    response = new_model.to_dict()
+    if before_commit:
+        before_commit(new_model)
     db.session.commit()
 
-    return new_model.to_dict(), 201
+    return response, 201
+
+
+def model_changes(cls, model_data):
+    # Column values from a PUT body, validated like create_model does
+    try:
+        return cls.changes_from_dict(model_data)
+    except ValueError as e:
+        response = {"message": str(e)}
+        abort(make_response(response, 400))
+
+
+def update_model(cls, model_id, changes, *returning):
+    """Apply ``changes`` to one row with a single UPDATE ... RETURNING.
+
+    Aborts with 404 when no row has the id, so no SELECT is needed first.
+    Returns the ``returning`` columns of the updated row.
+    """
+    model_id = parse_model_id(cls, model_id)
+    query = (
+        db.update(cls)
+        .where(cls.id == model_id)
+        # With nothing to change, a no-op SET still tells whether the row exists
+        .values(changes or {cls.id: cls.id})
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.session.execute(query).one_or_none()
+
+    if not row:
+        abort_not_found(cls, model_id)
+
+    return row
+
+
+def delete_model(cls, model_id, *returning):
+    """Delete one row with a single DELETE ... RETURNING, aborting with 404 when it doesn't exist."""
+    model_id = parse_model_id(cls, model_id)
+    query = (
+        db.delete(cls)
+        .where(cls.id == model_id)
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.session.execute(query).one_or_none()
+
+    if not row:
+        abort_not_found(cls, model_id)
+
+    return row
+
+
+def abort_cards_not_found(missing_ids):
+    response = {
+        "message": f"Card {', '.join(map(str, missing_ids))} not found",
+        "missing_card_ids": missing_ids
+    }
+    abort(make_response(response, 404))
+
+
+def find_cards(card_ids, lock=False):
+    """Map each card id to its (board_id, likes_count) row with one query, aborting with 404 if any are missing."""
+    query = db.select(Card.id, Card.board_id, Card.likes_count).where(Card.id.in_(card_ids))
+    if lock:
+        query = query.with_for_update()
+    cards = {row.id: row for row in db.session.execute(query)}
+
+    missing_ids = [card_id for card_id in card_ids if card_id not in cards]
+    if missing_ids:
+        abort_cards_not_found(missing_ids)
+
+    return cards
+
+
+def find_card_boards(card_ids, lock=False):
+    """Map each card id to its board id with one query, aborting with 404 if any are missing."""
+    return {card_id: card.board_id for card_id, card in find_cards(card_ids, lock).items()}
+
+
+def get_batch(request_body, key):
+    """Return the non-empty list under ``key``, capped at MAX_BATCH_SIZE items."""
+    items = request_body.get(key) if isinstance(request_body, dict) else None
+    if not isinstance(items, list) or not items:
+        abort(make_response({"message": f"Request must include a list of {key}"}, 400))
+
+    max_batch_size = current_app.config["MAX_BATCH_SIZE"]
+    if len(items) > max_batch_size:
+        response = {"message": f"A batch can't have more than {max_batch_size} {key}"}
+        abort(make_response(response, 400))
+
+    return items
+
+
+def validate_batch(items, build):
+    """Call ``build`` on every item and return the results in order.
+
+    ``build`` raises KeyError or ValueError like ``from_dict`` does. All
+    invalid items are reported together in one 400 response, so a batch is
+    written completely or not at all.
+    """
+    results, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Each item must be an object")
+            results.append(build(item))
+        except KeyError as e:
+            errors.append({"index": index, "message": f"Missed required field: {str(e)}"})
+        except ValueError as e:
+            errors.append({"index": index, "message": str(e)})
+
+    if errors:
+        response = {"message": f"{len(errors)} invalid item(s); nothing was saved", "errors": errors}
+        abort(make_response(response, 400))
+
+    return results
+
+
+def parse_query_int(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        response = {"message": f"Query parameter {name} must be an integer"}
+        abort(make_response(response, 400))
+
+
+# Sort keys accepted by the card list endpoints; likes default to most liked first
+CARD_SORTS = {"id": Card.id, "likes": Card.likes_count, "message": Card.message}
+DESCENDING_BY_DEFAULT = {"likes"}
+
+
+def parse_card_sort():
+    """Read ``sort`` and ``order`` from the query string as a (column, descending) pair.
+
+    ``top`` without a ``sort`` means most liked first.
+    """
+    sort = request.args.get("sort", "likes" if "top" in request.args else "id")
+    if sort not in CARD_SORTS:
+        abort(make_response({"message": f"Query parameter sort must be one of: {', '.join(CARD_SORTS)}"}, 400))
+
+    order = request.args.get("order", "desc" if sort in DESCENDING_BY_DEFAULT else "asc")
+    if order not in ("asc", "desc"):
+        abort(make_response({"message": "Query parameter order must be asc or desc"}, 400))
+
+    return CARD_SORTS[sort], order == "desc"
+
+
+def parse_fields(cls):
+    """Read ``fields`` (comma-separated) as a tuple of ``cls.FIELDS``, all of them by default."""
+    fields_param = request.args.get("fields")
+    if fields_param is None:
+        return cls.FIELDS
+
+    requested = {field.strip() for field in fields_param.split(",")}
+    if not requested <= set(cls.FIELDS):
+        response = {"message": f"Query parameter fields must be a subset of: {', '.join(cls.FIELDS)}"}
+        abort(make_response(response, 400))
+
+    return tuple(field for field in cls.FIELDS if field in requested)
+
+
+def field_columns(cls, fields):
+    return [getattr(cls, field) for field in fields]
+
+
+def select_fields(cls, fields, *extra_columns):
+    """Select ``fields`` of ``cls`` (plus ``extra_columns``) for a list endpoint.
+
+    With READ_PATH "core" this selects plain columns and the results are
+    rows; with "orm" it loads instances with only those columns. The id is
+    always selected so the page cursor can be read from the last item.
+    """
+    columns = field_columns(cls, fields)
+    if current_app.config["READ_PATH"] == "orm":
+        return db.select(cls).options(load_only(*columns, *extra_columns))
+
+    extra_columns = [column for column in (cls.id, *extra_columns) if column.key not in fields]
+    return db.select(*columns, *dict.fromkeys(extra_columns))
+
+
+def fetch_all(query):
+    if current_app.config["READ_PATH"] == "orm":
+        return db.session.scalars(query).all()
+    return db.session.execute(query).all()
+
+
+def to_output(items, fields):
+    """Turn the results of a ``select_fields`` query into response items."""
+    if current_app.config["READ_PATH"] == "orm":
+        return [item.to_dict(fields) for item in items]
+    if items and len(items[0]) == len(fields):
+        # The JSON provider writes rows as objects
+        return items
+    # Drop the columns selected only for the cursor
+    return [dict(zip(fields, row)) for row in items]
+
+
+def wants_compact():
+    return request.args.get("compact") == "true"
+
+
+def parse_top():
+    """Read ``top`` (the number of rows wanted), clamped to MAX_PAGE_SIZE, or None."""
+    top = parse_query_int("top", None)
+    if top is None:
+        return None
+    return max(1, min(top, current_app.config["MAX_PAGE_SIZE"]))
+
+
+def sort_order(cls, sort_column, descending):
+    # Ties are broken by ascending id, matching the (likes_count DESC, id) indexes
+    if sort_column is cls.id:
+        return [cls.id.desc() if descending else cls.id]
+    return [sort_column.desc() if descending else sort_column, cls.id]
+
+
+def keyset_after(cls, sort_column, descending, cursor):
+    """Filter for the rows that come after ``cursor`` in the sort order.
+
+    The cursor is the last id the client has seen, or ``<value>,<id>`` when
+    sorting by another column.
+    """
+    if sort_column is cls.id:
+        after = parse_query_int("after", None)
+        return cls.id < after if descending else cls.id > after
+
+    value, _, after_id = cursor.rpartition(",")
+    try:
+        after_id = int(after_id)
+        value = sort_column.type.python_type(value)
+    except ValueError:
+        abort(make_response({"message": "Query parameter after is not a valid cursor"}, 400))
+
+    beyond = sort_column < value if descending else sort_column > value
+    return db.or_(beyond, db.and_(sort_column == value, cls.id > after_id))
+
+
+def paginate(cls, query, sort_column=None, descending=False):
+    """Fetch one keyset page of ``query``, ordered by ``cls.id`` unless a sort column is given.
+
+    Reads ``after`` (the cursor of the last row the client has seen) and
+    ``limit`` from the query string and clamps ``limit`` to
+    ``MAX_PAGE_SIZE``. Returns the page and the headers pointing to the next
+    page, if there is one.
+    """
+    if sort_column is None:
+        sort_column = cls.id
+    limit = parse_query_int("limit", current_app.config["DEFAULT_PAGE_SIZE"])
+    limit = max(1, min(limit, current_app.config["MAX_PAGE_SIZE"]))
+
+    cursor = request.args.get("after")
+    if cursor is not None:
+        query = query.where(keyset_after(cls, sort_column, descending, cursor))
+    query = query.order_by(*sort_order(cls, sort_column, descending)).limit(limit + 1)
+    result = db.session.execute(query)
+    # Selecting the model itself yields instances, selecting columns yields rows
+    if query.column_descriptions[0]["expr"] is cls:
+        result = result.scalars()
+    page = result.all()
+
+    headers = {}
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = str(last.id) if sort_column is cls.id else f"{getattr(last, sort_column.key)},{last.id}"
+        args = {**request.args, "after": next_cursor, "limit": limit}
+        next_url = url_for(request.endpoint, **request.view_args, **args)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return page, headers
+
+
+def touch_boards(*board_ids, counts=None):
+    """Bump the version of boards whose title, owner or cards changed.
+
+    ``counts`` maps board ids to a ``(cards, likes)`` pair that is added to
+    their card_count and likes_total in the same statement. Call before
+    committing so the bump lands in the same transaction.
+    """
+    if not counts:
+        db.session.execute(
+            db.update(Board)
+            .where(Board.id.in_(set(board_ids)))
+            .values(version=Board.version + 1, updated_at=db.func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return
+
+    board_table = Board.__table__
+    query = (
+        db.update(board_table)
+        .where(board_table.c.id == bindparam("board_id"))
+        .values(
+            version=board_table.c.version + 1,
+            updated_at=db.func.now(),
+            card_count=board_table.c.card_count + bindparam("cards"),
+            likes_total=board_table.c.likes_total + bindparam("likes")
+        )
+    )
+    params = []
+    # Update in id order so concurrent requests lock the rows in the same order
+    for board_id in sorted({*board_ids, *counts}):
+        cards, likes = counts.get(board_id, (0, 0))
+        params.append({"board_id": board_id, "cards": cards, "likes": likes})
+    db.session.execute(query, params)
+
+
+def tally_cards(cards, sign=1):
+    """Sum ``(board_id, likes_count)`` pairs into touch_boards counts; ``sign=-1`` for removed cards."""
+    counts = {}
+    for board_id, likes_count in cards:
+        card_total, likes_total = counts.get(board_id, (0, 0))
+        counts[board_id] = (card_total + sign, likes_total + sign * likes_count)
+    return counts
+
+
+def reconcile_board_counts():
+    """Recompute card_count and likes_total from the cards and fix boards that drifted.
+
+    One UPDATE with correlated aggregates; returns the ids of the boards it
+    changed, whose versions are bumped like any other change.
+    """
+    card_count = db.select(db.func.count(Card.id)).where(Card.board_id == Board.id).scalar_subquery()
+    likes_total = (
+        db.select(db.func.coalesce(db.func.sum(Card.likes_count), 0))
+        .where(Card.board_id == Board.id)
+        .scalar_subquery()
+    )
+    query = (
+        db.update(Board)
+        .where(db.or_(Board.card_count != card_count, Board.likes_total != likes_total))
+        .values(
+            card_count=card_count, likes_total=likes_total,
+            version=Board.version + 1, updated_at=db.func.now()
+        )
+        .returning(Board.id)
+        .execution_options(synchronize_session=False)
+    )
+    board_ids = db.session.scalars(query).all()
+    db.session.commit()
+    return board_ids
+
+
+def record_card_changes(changes):
+    """Log ``(board_id, card_id)`` pairs for GET /boards/<board_id>/changes.
+
+    Call after touch_boards and before committing: each row takes the version
+    the bump just gave its board, in the same transaction.
+    """
+    changes = set(changes)
+    if not changes:
+        return
+
+    change_table = CardChange.__table__
+    board_version = db.select(Board.version).where(Board.id == bindparam("change_board_id")).scalar_subquery()
+    query = db.insert(change_table).values(
+        board_id=bindparam("change_board_id"), card_id=bindparam("change_card_id"), version=board_version
+    )
+    db.session.execute(query, [
+        {"change_board_id": board_id, "change_card_id": card_id} for board_id, card_id in sorted(changes)
+    ])
+
+
+def compact_card_changes():
+    """Delete every change that a later change of the same card on the same board supersedes.
+
+    The changes endpoint only needs the latest change of each card, so this
+    loses nothing; returns the number of rows removed.
+    """
+    latest = db.aliased(CardChange)
+    newer_change = (
+        db.select(latest.id)
+        .where(latest.board_id == CardChange.board_id, latest.card_id == CardChange.card_id, latest.id > CardChange.id)
+        .exists()
+    )
+    result = db.session.execute(
+        db.delete(CardChange).where(newer_change).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def as_utc(moment):
+    # SQLite hands back naive datetimes; they are stored in UTC
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def check_not_modified(etag, last_modified=None):
+    """Abort with 304 Not Modified if the client's copy matches ``etag``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, which is
+    only checked when ``last_modified`` is given.
+    """
+    last_modified = last_modified and as_utc(last_modified)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+        set_validators(response, etag, last_modified)
+        abort(response)
+
+
+def set_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = as_utc(last_modified)
+    return response
+
+
+def wants_stream():
+    return request.args.get("stream") == "true"
+
+
+def keyset_window(cls, query, sort_column=None, descending=False):
+    """Apply the after/limit params without a page size cap, for streamed responses.
+
+    Rows come in the same order as ``paginate`` gives them, so ``after`` takes
+    the same cursors.
+    """
+    if sort_column is None:
+        sort_column = cls.id
+    cursor = request.args.get("after")
+    if cursor is not None:
+        query = query.where(keyset_after(cls, sort_column, descending, cursor))
+    query = query.order_by(*sort_order(cls, sort_column, descending))
+    return query.limit(parse_query_int("limit", None))
+
+
+def json_array(items):
+    dumps = current_app.json.dumps
+    yield "["
+    for index, item in enumerate(items):
+        yield ("," if index else "") + dumps(item)
+    yield "]"
+
+
+def chunked(fragments, chunk_size=64 * 1024):
+    # Join small JSON fragments so the server writes a few large chunks
+    buffer, buffered = [], 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_json(fragments):
+    """Stream JSON text fragments as the response body.
+
+    The generator runs after the view returns, inside the request context,
+    so it can keep reading from a query that fetches rows in batches.
+    """
+    return Response(stream_with_context(chunked(fragments)), mimetype="application/json")
+
+
+def stream_rows(cls, query, sort_column=None, descending=False):
+    """Stream the rows of a column ``query`` as a JSON array of objects.
+
+    Rows are fetched STREAM_BATCH_SIZE at a time (a server-side cursor on
+    Postgres), so memory use does not grow with the size of the result.
+    """
+    query = keyset_window(cls, query, sort_column, descending).execution_options(yield_per=current_app.config["STREAM_BATCH_SIZE"])
+    rows = db.session.execute(query)
+    return stream_json(json_array(row._asdict() for row in rows))
@@ -0,0 +1,18 @@
+import os
+from flask import Blueprint, current_app
+from ..apidocs import swag_from
+from ..db import db
+
+bp = Blueprint("metrics_bp", __name__, url_prefix="/metrics")
+
+
+@bp.get("")
+@swag_from("../../docs/metrics/get_metrics.yml")
+def get_metrics():
+    pool_metrics = current_app.extensions["pool_metrics"]
+    replicas = current_app.extensions.get("replicas")
+    return {
+        "pid": os.getpid(),
+        "pool": pool_metrics.snapshot(db.engine.pool),
+        "replicas": replicas.status() if replicas else []
+    }
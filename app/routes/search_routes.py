@@ -0,0 +1,35 @@
+import time
+from flask import Blueprint, current_app, request
+from ..apidocs import swag_from
+from ..search import search_boards, search_cards
+from .helpers import parse_query_int
+
+bp = Blueprint("search_bp", __name__, url_prefix="/search")
+
+SEARCH_TYPES = {"boards": search_boards, "cards": search_cards}
+
+@bp.get("")
+@swag_from("../../docs/search/search.yml")
+def search():
+    search_text = request.args.get("q", "").strip()
+    if not search_text:
+        return {"message": "Query parameter q is required"}, 400
+
+    search_type = request.args.get("type")
+    if search_type and search_type not in SEARCH_TYPES:
+        return {"message": f"Query parameter type must be one of: {', '.join(SEARCH_TYPES)}"}, 400
+
+    limit = parse_query_int("limit", 20)
+    limit = max(1, min(limit, current_app.config["MAX_PAGE_SIZE"]))
+    offset = max(0, parse_query_int("offset", 0))
+
+    start = time.perf_counter()
+    results = {
+        name: search_fn(search_text, limit, offset)
+        for name, search_fn in SEARCH_TYPES.items()
+        if not search_type or name == search_type
+    }
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    headers = {"Server-Timing": f"search;dur={duration_ms:.2f}"}
+    return {"query": search_text, **results}, 200, headers
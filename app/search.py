@@ -0,0 +1,115 @@
+import re
+from sqlalchemy import DDL, Index, event, func, text
+from .db import db
+from .models.board import Board
+from .models.card import Card
+
+# Postgres: the search vectors are GIN expression indexes, so the database keeps
+# them current on every write. Queries must use the exact same expressions.
+board_table, card_table = Board.__table__, Card.__table__
+BOARD_DOCUMENT = func.to_tsvector(
+    text("'english'"), board_table.c.title.concat(text("' '")).concat(board_table.c.owner)
+)
+CARD_DOCUMENT = func.to_tsvector(text("'english'"), card_table.c.message)
+
+Index("ix_board_search", BOARD_DOCUMENT, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("ix_card_search", CARD_DOCUMENT, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# SQLite: FTS5 tables over the board and card rows, kept in sync by triggers
+SQLITE_SEARCH_DDL = {
+    board_table: [
+        "CREATE VIRTUAL TABLE board_fts USING fts5(title, owner, content='board', content_rowid='id')",
+        """CREATE TRIGGER board_fts_insert AFTER INSERT ON board BEGIN
+            INSERT INTO board_fts(rowid, title, owner) VALUES (new.id, new.title, new.owner);
+        END""",
+        """CREATE TRIGGER board_fts_delete AFTER DELETE ON board BEGIN
+            INSERT INTO board_fts(board_fts, rowid, title, owner) VALUES ('delete', old.id, old.title, old.owner);
+        END""",
+        """CREATE TRIGGER board_fts_update AFTER UPDATE OF title, owner ON board BEGIN
+            INSERT INTO board_fts(board_fts, rowid, title, owner) VALUES ('delete', old.id, old.title, old.owner);
+            INSERT INTO board_fts(rowid, title, owner) VALUES (new.id, new.title, new.owner);
+        END""",
+    ],
+    card_table: [
+        "CREATE VIRTUAL TABLE card_fts USING fts5(message, content='card', content_rowid='id')",
+        """CREATE TRIGGER card_fts_insert AFTER INSERT ON card BEGIN
+            INSERT INTO card_fts(rowid, message) VALUES (new.id, new.message);
+        END""",
+        """CREATE TRIGGER card_fts_delete AFTER DELETE ON card BEGIN
+            INSERT INTO card_fts(card_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        END""",
+        """CREATE TRIGGER card_fts_update AFTER UPDATE OF message ON card BEGIN
+            INSERT INTO card_fts(card_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            INSERT INTO card_fts(rowid, message) VALUES (new.id, new.message);
+        END""",
+    ],
+}
+
+for table, statements in SQLITE_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table, "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {table.name}_fts").execute_if(dialect="sqlite")
+    )
+
+
+def fts5_query(search_text):
+    # Quote every word so user input can't use FTS5 query syntax; words are ANDed
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", search_text))
+
+
+def search_boards(search_text, limit, offset):
+    """Return board dicts matching ``search_text`` with a ``rank``, best match first."""
+    if db.engine.dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(text("'english'"), search_text)
+        rank = func.ts_rank(BOARD_DOCUMENT, tsquery).label("rank")
+        query = (
+            db.select(Board.id, Board.title, Board.owner, rank)
+            .where(BOARD_DOCUMENT.op("@@")(tsquery))
+            .order_by(rank.desc(), Board.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = db.session.execute(query)
+    else:
+        match = fts5_query(search_text)
+        if not match:
+            return []
+        rows = db.session.execute(text("""
+            SELECT board.id, board.title, board.owner, -bm25(board_fts) AS rank
+            FROM board_fts JOIN board ON board.id = board_fts.rowid
+            WHERE board_fts MATCH :match
+            ORDER BY rank DESC, board.id
+            LIMIT :limit OFFSET :offset
+        """), {"match": match, "limit": limit, "offset": offset})
+
+    return [dict(row._mapping) for row in rows]
+
+
+def search_cards(search_text, limit, offset):
+    """Return card dicts matching ``search_text`` with a ``rank``, best match first."""
+    if db.engine.dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(text("'english'"), search_text)
+        rank = func.ts_rank(CARD_DOCUMENT, tsquery).label("rank")
+        query = (
+            db.select(Card.id, Card.message, Card.likes_count, Card.board_id, rank)
+            .where(CARD_DOCUMENT.op("@@")(tsquery))
+            .order_by(rank.desc(), Card.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = db.session.execute(query)
+    else:
+        match = fts5_query(search_text)
+        if not match:
+            return []
+        rows = db.session.execute(text("""
+            SELECT card.id, card.message, card.likes_count, card.board_id, -bm25(card_fts) AS rank
+            FROM card_fts JOIN card ON card.id = card_fts.rowid
+            WHERE card_fts MATCH :match
+            ORDER BY rank DESC, card.id
+            LIMIT :limit OFFSET :offset
+        """), {"match": match, "limit": limit, "offset": offset})
+
+    return [dict(row._mapping) for row in rows]
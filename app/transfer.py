@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import time
+from .db import db
+from .models.board import Board
+from .models.card import Card
+from .routes.helpers import touch_boards
+
+CSV_FIELDS = ["type", "id", "board_id", "title", "owner", "message", "likes_count"]
+
+
+class TransferError(ValueError):
+    """A record in an import file is invalid. Nothing from the file is saved."""
+
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+
+
+def export_records(batch_size=1000):
+    """Yield every board followed by its cards, reading rows in batches."""
+    query = (
+        db.select(
+            Board.id, Board.title, Board.owner,
+            Card.id.label("card_id"), Card.message, Card.likes_count
+        )
+        .outerjoin(Card, Card.board_id == Board.id)
+        .order_by(Board.id, Card.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    current_board_id = None
+    for row in db.session.execute(query):
+        if row.id != current_board_id:
+            current_board_id = row.id
+            yield {"type": "board", "id": row.id, "title": row.title, "owner": row.owner}
+        if row.card_id is not None:
+            yield {
+                "type": "card", "id": row.card_id, "board_id": row.id,
+                "message": row.message, "likes_count": row.likes_count
+            }
+
+
+def to_ndjson(records):
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def to_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def parse_ndjson(stream):
+    """Yield (line number, record) from a binary stream of JSON lines."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise TransferError(line_number, "invalid JSON")
+        if not isinstance(record, dict):
+            raise TransferError(line_number, "each line must be a JSON object")
+        yield line_number, record
+
+
+def parse_csv(stream):
+    """Yield (line number, record) from a binary CSV stream with a header row.
+
+    Values stay strings; import_records converts likes_count and reports a bad one by line.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    for record in reader:
+        record = {key: value for key, value in record.items() if value not in (None, "")}
+        yield reader.line_num, record
+
+
+PARSERS = {"ndjson": parse_ndjson, "csv": parse_csv}
+WRITERS = {"ndjson": to_ndjson, "csv": to_csv}
+
+
+def import_records(records, chunk_size=1000):
+    """Insert boards and cards from (line number, record) pairs.
+
+    Cards are buffered and written ``chunk_size`` rows per INSERT, so memory
+    stays flat however large the input is. Boards are inserted as they
+    arrive so their new ids are known before their cards. Cards must come
+    after their board, as in an export. Ids in the file are only used to
+    link cards to boards; imported rows get new ids. Everything is committed
+    in one transaction. Returns counts and throughput.
+    """
+    start = time.perf_counter()
+    new_board_ids = {}
+    pending_cards = []
+    card_count = 0
+    # card_count and likes_total of each new board, written once at the end
+    board_counts = {}
+    card_table = Card.__table__
+
+    def flush_cards():
+        if pending_cards:
+            db.session.execute(db.insert(card_table), pending_cards)
+            pending_cards.clear()
+
+    try:
+        for line_number, record in records:
+            try:
+                record_type = record["type"]
+                if record_type == "board":
+                    board = Board.from_dict(record)
+                    new_board_ids[record.get("id")] = db.session.scalar(
+                        db.insert(Board).values(title=board.title, owner=board.owner).returning(Board.id)
+                    )
+                elif record_type == "card":
+                    if record["board_id"] not in new_board_ids:
+                        raise TransferError(line_number, f"card refers to board {record['board_id']} that is not in the file")
+                    # Validated like PUT /cards/<card_id> does
+                    changes = Card.changes_from_dict({"message": record["message"]})
+                    likes_count = int(record.get("likes_count", 0))
+                    board_id = new_board_ids[record["board_id"]]
+                    pending_cards.append({**changes, "likes_count": likes_count, "board_id": board_id})
+                    cards, likes = board_counts.get(board_id, (0, 0))
+                    board_counts[board_id] = (cards + 1, likes + likes_count)
+                    card_count += 1
+                    if len(pending_cards) >= chunk_size:
+                        flush_cards()
+                else:
+                    raise TransferError(line_number, f"unknown record type {record_type!r}")
+            except KeyError as e:
+                raise TransferError(line_number, f"missed required field: {str(e)}")
+            except TransferError:
+                raise
+            except (TypeError, ValueError) as e:
+                raise TransferError(line_number, str(e))
+
+        flush_cards()
+        if board_counts:
+            touch_boards(counts=board_counts)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    seconds = time.perf_counter() - start
+    rows = len(new_board_ids) + card_count
+    return {
+        "boards": len(new_board_ids),
+        "cards": card_count,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else rows
+    }
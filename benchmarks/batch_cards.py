@@ -0,0 +1,61 @@
+"""Compare creating, updating and deleting cards one request at a time with the /batch endpoints.
+
+Run with ``python -m benchmarks.batch_cards``. Prints cards per second for both paths.
+"""
+from app.db import db
+from app.models.board import Board
+from .common import create_benchmark_app, measure, print_table
+
+CARD_COUNT = 1000
+
+
+def main():
+    app = create_benchmark_app({"CACHE_BACKEND": "none"})
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        board = Board(title="Bench", owner="Bench")
+        db.session.add(board)
+        db.session.commit()
+        board_id = board.id
+
+        with measure() as single_create:
+            card_ids = [
+                client.post(f"/boards/{board_id}/cards", json={"message": f"Card {i}"}).get_json()["id"]
+                for i in range(CARD_COUNT)
+            ]
+        with measure() as single_update:
+            for card_id in card_ids:
+                client.put(f"/cards/{card_id}", json={"message": "Updated"})
+        with measure() as single_delete:
+            for card_id in card_ids:
+                client.delete(f"/cards/{card_id}")
+
+        cards = [{"message": f"Card {i}"} for i in range(CARD_COUNT)]
+        with measure() as batch_create:
+            response = client.post(f"/boards/{board_id}/cards/batch", json={"cards": cards})
+        card_ids = [card["id"] for card in response.get_json()["cards"]]
+        with measure() as batch_update:
+            client.patch("/cards/batch", json={"cards": [{"id": card_id, "message": "Updated"} for card_id in card_ids]})
+        with measure() as batch_delete:
+            client.delete("/cards/batch", json={"card_ids": card_ids})
+
+    for operation, single, batch in [
+        ("create", single_create, batch_create),
+        ("update", single_update, batch_update),
+        ("delete", single_delete, batch_delete),
+    ]:
+        single_rate = CARD_COUNT / single["seconds"]
+        batch_rate = CARD_COUNT / batch["seconds"]
+        rows.append((
+            operation, f"{single_rate:,.0f}", single["queries"],
+            f"{batch_rate:,.0f}", batch["queries"], f"{batch_rate / single_rate:.1f}x"
+        ))
+
+    print(f"{CARD_COUNT} cards")
+    print_table(("operation", "single cards/s", "queries", "batch cards/s", "queries", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
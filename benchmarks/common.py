@@ -0,0 +1,41 @@
+import os
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app
+from app.db import db
+
+
+def create_benchmark_app(config=None):
+    """Create an app on BENCHMARK_DATABASE_URI (in-memory SQLite by default) with fresh tables."""
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": os.environ.get("BENCHMARK_DATABASE_URI", "sqlite://"),
+        **(config or {})
+    })
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+@contextmanager
+def measure():
+    """Time the block and count the SQL statements it sends to the database."""
+    result = {"queries": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        result["queries"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        event.remove(db.engine, "before_cursor_execute", count)
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
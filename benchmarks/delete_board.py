@@ -0,0 +1,61 @@
+"""Delete boards of growing size with DELETE /boards/<board_id>.
+
+Run with ``python -m benchmarks.delete_board``. The cards go with the board
+through ON DELETE CASCADE and their cached responses with one tag, so the
+statement count and the peak Python memory stay flat as the number of cards
+grows, with or without the response cache.
+"""
+import tracemalloc
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, measure, print_table
+
+CARD_COUNTS = [100, 10_000, 50_000]
+
+
+def create_board(card_count):
+    board = Board(title="Benchmark", owner="Bench")
+    db.session.add(board)
+    db.session.flush()
+    db.session.execute(
+        db.insert(Card), [{"message": f"Card {i}", "board_id": board.id} for i in range(card_count)]
+    )
+    db.session.commit()
+    return board.id
+
+
+def main():
+    rows = []
+    for cache_backend in ("none", "memory"):
+        rows.extend(run(cache_backend))
+    print_table(("cache", "cards", "ms", "queries", "peak MB"), rows)
+
+
+def run(cache_backend):
+    app = create_benchmark_app({"CACHE_BACKEND": cache_backend})
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        for card_count in CARD_COUNTS:
+            board_id = create_board(card_count)
+            db.session.remove()
+
+            tracemalloc.start()
+            with measure() as result:
+                response = client.delete(f"/boards/{board_id}")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            assert response.status_code == 204
+            assert db.session.scalar(db.select(db.func.count(Card.id))) == 0
+            rows.append((
+                cache_backend, f"{card_count:,}", f"{result['seconds'] * 1000:.1f}", result["queries"],
+                f"{peak / 2**20:.1f}"
+            ))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
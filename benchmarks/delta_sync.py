@@ -0,0 +1,52 @@
+"""Compare re-fetching a board's cards with fetching its changes after one like.
+
+Run with ``python -m benchmarks.delta_sync``. The full response grows with
+the board, while GET /boards/<board_id>/changes stays the size of the
+activity since the client's version.
+"""
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, measure, print_table
+
+CARD_COUNTS = [100, 10_000, 50_000]
+
+
+def main():
+    app = create_benchmark_app({"CACHE_BACKEND": "none"})
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        for card_count in CARD_COUNTS:
+            board = Board(title="Benchmark", owner="Bench", card_count=card_count)
+            db.session.add(board)
+            db.session.flush()
+            board_id = board.id
+            db.session.execute(
+                db.insert(Card), [{"message": f"Card {i}", "board_id": board_id} for i in range(card_count)]
+            )
+            db.session.commit()
+
+            since = client.get(f"/boards/{board_id}/cards").headers["Board-Version"]
+            card_id = db.session.scalar(db.select(Card.id).where(Card.board_id == board_id).limit(1))
+            client.patch(f"/cards/{card_id}/like")
+
+            with measure() as full:
+                full_response = client.get(f"/boards/{board_id}/cards")
+            with measure() as delta:
+                delta_response = client.get(f"/boards/{board_id}/changes?since={since}")
+
+            rows.append((
+                f"{card_count:,}",
+                f"{len(full_response.data):,}", f"{full['seconds'] * 1000:.1f}",
+                f"{len(delta_response.data):,}", f"{delta['seconds'] * 1000:.1f}"
+            ))
+            db.session.execute(db.delete(Board))
+            db.session.commit()
+
+    print_table(("cards", "full bytes", "ms", "changes bytes", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Import and export a generated board set through the bulk transfer functions.
+
+Run with ``python -m benchmarks.import_export``. Prints rows per second and the
+peak Python memory of each step for a few input sizes; the peak should stay
+flat as the number of cards grows.
+"""
+import io
+import json
+import tracemalloc
+from app.db import db
+from app.transfer import PARSERS, WRITERS, export_records, import_records
+from .common import create_benchmark_app, measure, print_table
+
+CARD_COUNTS = [10_000, 100_000]
+CARDS_PER_BOARD = 100
+
+
+def generate_ndjson(card_count):
+    for board_id in range(card_count // CARDS_PER_BOARD):
+        yield json.dumps({"type": "board", "id": board_id, "title": f"Board {board_id}", "owner": "Bench"})
+        for i in range(CARDS_PER_BOARD):
+            yield json.dumps({"type": "card", "board_id": board_id, "message": f"Card {i}", "likes_count": i})
+
+
+def main():
+    app = create_benchmark_app({"CACHE_BACKEND": "none"})
+    rows = []
+
+    with app.app_context():
+        for card_count in CARD_COUNTS:
+            source = io.BytesIO("\n".join(generate_ndjson(card_count)).encode())
+            row_count = card_count + card_count // CARDS_PER_BOARD
+
+            tracemalloc.start()
+            with measure() as imported:
+                import_records(PARSERS["ndjson"](source), chunk_size=app.config["IMPORT_CHUNK_SIZE"])
+            import_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            with measure() as exported:
+                for _ in WRITERS["ndjson"](export_records()):
+                    pass
+            export_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            rows.append((
+                f"{card_count:,}",
+                f"{row_count / imported['seconds']:,.0f}", imported["queries"], f"{import_peak / 2**20:.1f}",
+                f"{row_count / exported['seconds']:,.0f}", f"{export_peak / 2**20:.1f}"
+            ))
+            db.drop_all()
+            db.create_all()
+
+    print_table(("cards", "import rows/s", "queries", "peak MB", "export rows/s", "peak MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare ways of turning boards with cards into a JSON response body.
+
+Run with ``python -m benchmarks.json_encoding``. Serializes the same boards
+from ORM instances (``to_dict_with_cards``) and from rows
+(``boards_with_card_rows``, as /boards/with-cards does), each with the stdlib
+and the orjson provider, and prints the time per response.
+"""
+import time
+from sqlalchemy.orm import selectinload
+from app.db import db
+from app.json_provider import JSONProvider, OrjsonProvider
+from app.models.board import Board
+from app.models.card import Card
+from app.routes.board_routes import boards_with_card_rows
+from .common import create_benchmark_app, print_table
+
+BOARD_COUNT = 100
+CARDS_PER_BOARD = 100
+ROUNDS = 20
+
+
+def orm_boards(board_ids):
+    query = db.select(Board).where(Board.id.in_(board_ids)).options(selectinload(Board.cards)).order_by(Board.id)
+    boards = [board.to_dict_with_cards() for board in db.session.scalars(query)]
+    db.session.expunge_all()
+    return boards
+
+
+def row_boards(board_ids):
+    return boards_with_card_rows(board_ids, Card.FIELDS, compact=False)
+
+
+def timed(build, provider, board_ids):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = provider.response(build(board_ids)).get_data()
+    return (time.perf_counter() - start) / ROUNDS, len(body)
+
+
+def main():
+    app = create_benchmark_app({"CACHE_BACKEND": "none"})
+    rows = []
+
+    with app.test_request_context():
+        for board_number in range(BOARD_COUNT):
+            board = Board(title=f"Board {board_number}", owner="Bench")
+            db.session.add(board)
+            db.session.flush()
+            db.session.execute(db.insert(Card), [
+                {"message": f"Card {i}", "likes_count": i, "board_id": board.id} for i in range(CARDS_PER_BOARD)
+            ])
+        db.session.commit()
+        board_ids = db.session.scalars(db.select(Board.id)).all()
+
+        baseline = None
+        for build_name, build in [("orm + to_dict", orm_boards), ("rows", row_boards)]:
+            for provider_name, provider in [("stdlib", JSONProvider(app)), ("orjson", OrjsonProvider(app))]:
+                seconds, size = timed(build, provider, board_ids)
+                baseline = baseline or seconds
+                rows.append((build_name, provider_name, f"{seconds * 1000:.1f}", f"{size:,}", f"{baseline / seconds:.1f}x"))
+
+    print(f"{BOARD_COUNT} boards x {CARDS_PER_BOARD} cards, queries included")
+    print_table(("objects", "encoder", "ms/response", "bytes", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
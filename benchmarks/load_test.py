@@ -0,0 +1,145 @@
+"""Load-test gunicorn with each worker model on /boards and /cards.
+
+Run with ``python -m benchmarks.load_test``. For every worker class it starts
+``gunicorn -c gunicorn.conf.py`` on a seeded database, sends requests from
+CLIENTS keep-alive connections for DURATION seconds per endpoint and prints
+requests per second with p50 and p99 latency. gevent is skipped unless it
+is installed. The app runs with the settings gunicorn.conf.py ships, so with
+several workers and no Redis the response cache is off.
+
+BENCHMARK_DATABASE_URI picks the database (a temporary SQLite file when
+unset; in-memory SQLite can't be shared by workers). The client runs in
+this process, so compare rows with each other rather than with production.
+"""
+import http.client
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, print_table
+
+WORKER_CLASSES = ["sync", "gthread", "gevent"]
+ENDPOINTS = ["/boards?limit=100", "/cards?limit=100"]
+WORKERS = 2
+CLIENTS = 16
+DURATION = 5
+BOARDS = 100
+CARDS_PER_BOARD = 20
+
+
+def seed(database_uri):
+    app = create_benchmark_app({"SQLALCHEMY_DATABASE_URI": database_uri})
+    with app.app_context():
+        for board_id in range(BOARDS):
+            board = Board(title=f"Board {board_id}", owner="Bench", card_count=CARDS_PER_BOARD)
+            board.cards = [Card(message=f"Card {i}") for i in range(CARDS_PER_BOARD)]
+            db.session.add(board)
+        db.session.commit()
+        db.engine.dispose()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, database_uri, port):
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        "PORT": str(port),
+        "GUNICORN_WORKER_CLASS": worker_class,
+        "WEB_CONCURRENCY": str(WORKERS),
+        # The cache falls back to what gunicorn.conf.py ships for several workers; the
+        # benchmark doesn't follow board events, so the per-worker broker is fine
+        "GUNICORN_LOCAL_EVENTS": "true",
+        # Recycling restarts workers every few seconds at these rates and drops their keep-alive connections
+        "GUNICORN_MAX_REQUESTS": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({worker_class}) did not start")
+
+
+def run_client(port, path, stop_at, latencies, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        if response.status != 200:
+            errors.append(path)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def load(port, path, duration=DURATION):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    clients = [
+        threading.Thread(target=run_client, args=(port, path, stop_at, latencies, errors)) for _ in range(CLIENTS)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return len(latencies) / duration, percentiles[49] * 1000, percentiles[98] * 1000, len(errors)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_uri = os.environ.get("BENCHMARK_DATABASE_URI") or f"sqlite:///{tmp_dir}/load_test.db"
+        seed(database_uri)
+
+        rows = []
+        for worker_class in WORKER_CLASSES:
+            if worker_class == "gevent" and not importlib.util.find_spec("gevent"):
+                print("Skipping gevent: not installed")
+                continue
+
+            port = free_port()
+            server = start_server(worker_class, database_uri, port)
+            try:
+                for path in ENDPOINTS:
+                    load(port, path, duration=1)  # warm up the workers' connection pools
+                    requests_per_second, p50, p99, errors = load(port, path)
+                    rows.append((
+                        worker_class, path, f"{requests_per_second:,.0f}", f"{p50:.1f}", f"{p99:.1f}", errors
+                    ))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print_table(("workers", "endpoint", "req/s", "p50 ms", "p99 ms", "errors"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the ORM and core read paths of the list endpoints.
+
+Run with ``python -m benchmarks.read_path``. Requests the same pages with
+READ_PATH set to "orm" and then "core" and prints the time per request, time
+per row and the peak Python memory allocated while building the response.
+"""
+import time
+import tracemalloc
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, print_table
+
+BOARD_COUNT = 50
+CARDS_PER_BOARD = 200
+ROUNDS = 20
+URLS = [
+    ("/cards?limit=500", 500),
+    ("/boards?limit=50", BOARD_COUNT),
+    ("/boards/with-cards?limit=50", BOARD_COUNT * (CARDS_PER_BOARD + 1)),
+]
+
+
+def main():
+    app = create_benchmark_app({"CACHE_BACKEND": "none"})
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        for board_number in range(BOARD_COUNT):
+            board = Board(title=f"Board {board_number}", owner="Bench")
+            db.session.add(board)
+            db.session.flush()
+            db.session.execute(db.insert(Card), [
+                {"message": f"Card {i}", "likes_count": i, "board_id": board.id} for i in range(CARDS_PER_BOARD)
+            ])
+        db.session.commit()
+
+    for url, row_count in URLS:
+        results = {}
+        for read_path in ("orm", "core"):
+            app.config["READ_PATH"] = read_path
+            client.get(url)
+
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                client.get(url)
+            seconds = (time.perf_counter() - start) / ROUNDS
+
+            tracemalloc.start()
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[read_path] = seconds
+            rows.append((
+                url, read_path, f"{seconds * 1000:.2f}", f"{seconds / row_count * 1e6:.2f}",
+                f"{peak / 1024:,.0f}", f"{results['orm'] / seconds:.1f}x"
+            ))
+
+    print_table(("url", "read path", "ms/request", "us/row", "peak KB", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
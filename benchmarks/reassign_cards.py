@@ -0,0 +1,44 @@
+"""Time POST /boards/<id>/cards/assign for growing numbers of card ids.
+
+Run with ``python -m benchmarks.reassign_cards``. Query count should stay
+flat and time should grow far slower than the number of cards moved.
+"""
+from sqlalchemy import insert
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, measure, print_table
+
+CARD_COUNTS = [10, 100, 1000, 5000]
+
+
+def main():
+    app = create_benchmark_app()
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        for card_count in CARD_COUNTS:
+            source, target = Board(title="Source", owner="Bench"), Board(title="Target", owner="Bench")
+            db.session.add_all([source, target])
+            db.session.commit()
+            source_id, target_id = source.id, target.id
+
+            card_ids = db.session.scalars(
+                insert(Card).returning(Card.id),
+                [{"message": f"Card {i}", "board_id": source_id} for i in range(card_count)]
+            ).all()
+            db.session.commit()
+
+            with measure() as result:
+                response = client.post(f"/boards/{target_id}/cards/assign", json={"card_ids": card_ids})
+            assert response.status_code == 200
+
+            per_card_us = result["seconds"] / card_count * 1e6
+            rows.append((card_count, result["queries"], f"{result['seconds'] * 1000:.1f}", f"{per_card_us:.1f}"))
+
+    print_table(("cards", "queries", "total ms", "us/card"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure a worker's cold start: importing the app, create_app and its memory.
+
+Run with ``python -m benchmarks.startup``. Each run is a fresh interpreter,
+like a newly forked worker without preload, so nothing is already imported.
+Prints the median of several runs with Swagger on and off.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+WORKER = """
+import json, resource, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    "flasgger": "flasgger" in __import__("sys").modules,
+}))
+"""
+
+
+def run_worker(swagger_enabled):
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": os.environ.get("BENCHMARK_DATABASE_URI", "sqlite://"),
+        "SWAGGER_ENABLED": "true" if swagger_enabled else "false",
+    }
+    output = subprocess.run([sys.executable, "-c", WORKER], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def main():
+    rows = []
+    for swagger_enabled in (True, False):
+        results = [run_worker(swagger_enabled) for _ in range(RUNS)]
+        rows.append((
+            "on" if swagger_enabled else "off",
+            f"{statistics.median(result['import'] for result in results) * 1000:.0f}",
+            f"{statistics.median(result['create_app'] for result in results) * 1000:.1f}",
+            f"{statistics.median(result['rss'] for result in results) / 2**20:.1f}",
+            "yes" if results[0]["flasgger"] else "no"
+        ))
+
+    from .common import print_table
+    print_table(("swagger", "import ms", "create_app ms", "RSS MB", "flasgger loaded"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Stream growing numbers of cards with GET /cards?stream=true.
+
+Run with ``python -m benchmarks.stream_cards``. Rows are fetched
+STREAM_BATCH_SIZE at a time and written out in chunks, so the peak Python
+memory stays flat while the payload grows with the number of cards.
+"""
+import time
+import tracemalloc
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from .common import create_benchmark_app, print_table
+
+CARD_COUNTS = [1_000, 10_000, 100_000]
+
+
+def main():
+    app = create_benchmark_app()
+    client = app.test_client()
+    rows = []
+
+    with app.app_context():
+        board = Board(title="Benchmark", owner="Bench")
+        db.session.add(board)
+        db.session.commit()
+        board_id = board.id
+        inserted = 0
+        for card_count in CARD_COUNTS:
+            db.session.execute(db.insert(Card), [
+                {"message": f"Card number {i}", "likes_count": i % 7, "board_id": board_id}
+                for i in range(inserted, card_count)
+            ])
+            db.session.commit()
+            db.session.remove()
+            inserted = card_count
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = client.get("/cards?stream=true", buffered=False)
+            payload_size = sum(len(chunk) for chunk in response.response)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            response.close()
+
+            rows.append((
+                f"{card_count:,}", f"{seconds * 1000:.1f}", f"{payload_size / 2**20:.1f}", f"{peak / 2**20:.2f}"
+            ))
+
+    print_table(("cards", "ms", "payload MB", "peak MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Gunicorn settings for production: ``gunicorn -c gunicorn.conf.py``.
+
+Every setting can be overridden from the environment, which is how
+benchmarks/load_test.py compares worker models.
+"""
+import multiprocessing
+import os
+import sys
+
+wsgi_app = "app:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# "gthread" (default) or "sync", or "gevent" with `pip install gevent psycogreen`.
+#
+# Server-sent events (GET /boards/<board_id>/events) hold their connection for
+# as long as the client listens. Under gthread each open stream takes one of
+# the worker's threads, so a few listeners starve every other request; under
+# sync the stream blocks the worker's heartbeat and is killed after `timeout`.
+# Serve the events with gevent, e.g. a second `GUNICORN_WORKER_CLASS=gevent`
+# instance that the proxy routes /boards/*/events to. Both instances then need
+# EVENT_BROKER=redis, since events are published by whichever process handled the write.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# The in-process cache and event broker (the app's defaults) only see their own
+# worker: a write in one worker wouldn't invalidate another's cached responses,
+# and its events wouldn't reach streams held by another. With several workers the
+# memory cache is turned off, and the memory broker is refused unless
+# GUNICORN_LOCAL_EVENTS=true says no client follows board events.
+forced_settings = []
+if workers > 1 and os.environ.get("CACHE_BACKEND", "memory") == "memory":
+    os.environ["CACHE_BACKEND"] = "none"
+    forced_settings.append("CACHE_BACKEND=none (set CACHE_BACKEND=redis to share a cache between workers)")
+if (
+    workers > 1
+    and os.environ.get("EVENT_BROKER", "memory") == "memory"
+    and os.environ.get("GUNICORN_LOCAL_EVENTS") != "true"
+):
+    sys.exit(
+        f"EVENT_BROKER=memory can't deliver board events across {workers} workers; "
+        "set EVENT_BROKER=redis, or WEB_CONCURRENCY=1"
+    )
+# Threads per gthread worker. Each worker has its own connection pool and each
+# thread can hold one connection, so keep threads <= DB_POOL_SIZE + DB_MAX_OVERFLOW
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+# Concurrent greenlets per gevent worker
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# Import the app once in the master and fork it, so workers share its memory
+# pages and start faster; post_worker_init below gives each worker its own connections
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true") == "true"
+
+# Recycle workers now and then to cap slow memory growth; the jitter keeps
+# them from restarting all at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")
+
+
+def on_starting(server):
+    for setting in forced_settings:
+        server.log.warning("%d workers: using %s", workers, setting)
+
+
+def post_worker_init(worker):
+    # Runs after the gevent worker has monkey-patched the standard library (post_fork
+    # runs before), so the pools recreated here are built on gevent-aware locks
+    if worker.cfg.worker_class_str == "gevent":
+        # psycopg2 blocks the whole worker unless it waits through gevent
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+    if worker.cfg.preload_app:
+        from app.pool import dispose_after_fork
+        dispose_after_fork(worker.wsgi)
@@ -0,0 +1,42 @@
+"""Add card.board_id index and trigram search indexes
+
+Revision ID: 5b1d3c9a7e42
+Revises: e28c29d44fdd
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1d3c9a7e42'
+down_revision = 'e28c29d44fdd'
+branch_labels = None
+depends_on = None
+
+
+def is_postgresql():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_card_board_id'), ['board_id'], unique=False)
+
+    # Substring search indexes need pg_trgm; other databases keep scanning
+    if is_postgresql():
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_board_title_trgm', 'board', ['title'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+        op.create_index('ix_card_message_trgm', 'card', ['message'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if is_postgresql():
+        op.drop_index('ix_card_message_trgm', table_name='card')
+        op.drop_index('ix_board_title_trgm', table_name='board')
+
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_card_board_id'))
@@ -0,0 +1,71 @@
+"""Add full-text search indexes for boards and cards
+
+Revision ID: 8f2a6d41c0b3
+Revises: 5b1d3c9a7e42
+Create Date: 2026-10-18 11:03:54.218730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2a6d41c0b3'
+down_revision = '5b1d3c9a7e42'
+branch_labels = None
+depends_on = None
+
+
+# Mirrors SQLITE_SEARCH_DDL in app/search.py
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE board_fts USING fts5(title, owner, content='board', content_rowid='id')",
+    """CREATE TRIGGER board_fts_insert AFTER INSERT ON board BEGIN
+        INSERT INTO board_fts(rowid, title, owner) VALUES (new.id, new.title, new.owner);
+    END""",
+    """CREATE TRIGGER board_fts_delete AFTER DELETE ON board BEGIN
+        INSERT INTO board_fts(board_fts, rowid, title, owner) VALUES ('delete', old.id, old.title, old.owner);
+    END""",
+    """CREATE TRIGGER board_fts_update AFTER UPDATE OF title, owner ON board BEGIN
+        INSERT INTO board_fts(board_fts, rowid, title, owner) VALUES ('delete', old.id, old.title, old.owner);
+        INSERT INTO board_fts(rowid, title, owner) VALUES (new.id, new.title, new.owner);
+    END""",
+    "INSERT INTO board_fts(board_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE card_fts USING fts5(message, content='card', content_rowid='id')",
+    """CREATE TRIGGER card_fts_insert AFTER INSERT ON card BEGIN
+        INSERT INTO card_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+    """CREATE TRIGGER card_fts_delete AFTER DELETE ON card BEGIN
+        INSERT INTO card_fts(card_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END""",
+    """CREATE TRIGGER card_fts_update AFTER UPDATE OF message ON card BEGIN
+        INSERT INTO card_fts(card_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO card_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+    "INSERT INTO card_fts(card_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+
+    if dialect == 'postgresql':
+        op.create_index('ix_board_search', 'board',
+                        [sa.text("to_tsvector('english', title || ' ' || owner)")],
+                        unique=False, postgresql_using='gin')
+        op.create_index('ix_card_search', 'card',
+                        [sa.text("to_tsvector('english', message)")],
+                        unique=False, postgresql_using='gin')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_card_search', table_name='card')
+        op.drop_index('ix_board_search', table_name='board')
+    elif dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS card_fts')
+        op.execute('DROP TABLE IF EXISTS board_fts')
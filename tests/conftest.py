@@ -2,6 +2,7 @@ import pytest
 from app import create_app
 from app.db import db
 from flask.signals import request_finished
+from sqlalchemy import event
 from dotenv import load_dotenv
 import os
 from app.models.board import Board
@@ -14,7 +15,11 @@ load_dotenv()
 def app():
     test_config = {
         "TESTING": True,
-        "SQLALCHEMY_DATABASE_URI": os.environ.get('SQLALCHEMY_TEST_DATABASE_URI')
+        "SQLALCHEMY_DATABASE_URI": os.environ.get('SQLALCHEMY_TEST_DATABASE_URI'),
+        # Tests change rows directly between requests; test_cache.py enables caching
+        "CACHE_BACKEND": "none",
+        # test_apidocs.py covers the Swagger docs
+        "SWAGGER_ENABLED": False
     }
     app = create_app(test_config)
 
@@ -34,6 +39,35 @@ def client(app):
     return app.test_client()
 
 
+# App whose database can be shared by several threads (in-memory SQLite can't)
+@pytest.fixture
+def threaded_app(tmp_path):
+    database_uri = os.environ.get('SQLALCHEMY_TEST_DATABASE_URI')
+    if not database_uri or database_uri in ("sqlite://", "sqlite:///:memory:"):
+        database_uri = f"sqlite:///{tmp_path / 'threaded.db'}"
+
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": database_uri, "CACHE_BACKEND": "none"})
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+# Records every SQL statement sent to the database of the active app
+@pytest.fixture
+def query_log():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
 # One board
 @pytest.fixture
 def one_board(app):
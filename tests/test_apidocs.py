@@ -0,0 +1,36 @@
+import os
+import pytest
+from app import create_app
+
+
+@pytest.fixture
+def docs_client():
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": os.environ.get('SQLALCHEMY_TEST_DATABASE_URI'),
+        "SWAGGER_ENABLED": True
+    })
+    return app.test_client()
+
+
+# checks the spec is built from the YAML files of every route, including cached views
+def test_apispec_lists_routes(docs_client):
+    # Act
+    response = docs_client.get("/apispec_1.json")
+
+    # Assert
+    assert response.status_code == 200
+    paths = response.get_json()["paths"]
+    assert paths["/boards"]["get"]["summary"]
+    assert "/boards/{board_id}/changes" in paths
+    assert "/cards/top" in paths
+    assert docs_client.get("/apidocs/").status_code == 200
+
+
+# checks no docs routes are registered when SWAGGER_ENABLED is off
+def test_apidocs_disabled(client):
+    # Act
+    response = client.get("/apispec_1.json")
+
+    # Assert
+    assert response.status_code == 404
+    assert client.get("/apidocs/").status_code == 404
@@ -1,3 +1,5 @@
+import pytest
+from sqlalchemy import text
 from app.models.board import Board
 from app.db import db
 
@@ -28,7 +30,9 @@ def test_board_to_dict(app):
     assert board_dict == {
         "id": board.id,
         "title": "Dev Board",
-        "owner": "Tatyana"
+        "owner": "Tatyana",
+        "card_count": 0,
+        "likes_total": 0
     }
 
 def test_update_board_from_dict(app):
@@ -45,3 +49,14 @@ def test_update_board_from_dict(app):
     # Assert
     assert board.title == "New Title"
     assert board.owner == "New Owner"
+
+def test_title_search_uses_trigram_index(app):
+    if db.engine.dialect.name != "postgresql":
+        pytest.skip("Trigram indexes are only created on Postgres")
+
+    # Act
+    db.session.execute(text("SET enable_seqscan = off"))
+    plan = "\n".join(db.session.execute(text("EXPLAIN SELECT id FROM board WHERE title ILIKE '%board%'")).scalars())
+
+    # Assert
+    assert "ix_board_title_trgm" in plan
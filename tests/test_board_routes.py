@@ -1,4 +1,9 @@
 import json
+import pytest
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+from app.models.card_change import CardChange
 
 # checks POST /boards creates a new board
 def test_create_board(client):
@@ -18,6 +23,7 @@ def test_create_board(client):
 def test_get_all_boards(client, one_board):
     # Arrange
     # (one_board fixture creates a board already)
+    board_title = one_board.title
 
     # Act
     response = client.get("/boards")
@@ -26,7 +32,7 @@ def test_get_all_boards(client, one_board):
     assert response.status_code == 200
     data = response.get_json()
     assert isinstance(data, list)
-    assert any(board["title"] == one_board.title for board in data)
+    assert any(board["title"] == board_title for board in data)
 
 # checks GET /boards/<board_id> returns the correct board
 def test_get_one_board(client, one_board):
@@ -64,6 +70,45 @@ def test_delete_board(client, one_board):
     # Assert
     assert response.status_code == 204
 
+
+# checks deleting a board removes its cards in the database without loading them
+def test_delete_board_cascades_to_cards(client, three_cards, one_board, query_log):
+    # Arrange
+    board_id = one_board.id
+    query_log.clear()
+
+    # Act
+    response = client.delete(f"/boards/{board_id}")
+
+    # Assert
+    assert response.status_code == 204
+    assert db.session.scalar(db.select(db.func.count(Card.id))) == 0
+    deletes = [statement for statement in query_log if statement.startswith("DELETE")]
+    assert len(deletes) == 1
+    assert deletes[0].startswith("DELETE FROM board")
+
+
+# checks POST and PUT /boards send one statement each, and PUT/DELETE answer 404 for a missing board
+def test_board_writes_are_single_statements(client, query_log):
+    # Act
+    post_response = client.post("/boards", json={"title": "New", "owner": "Ada"})
+    post_queries = list(query_log)
+    query_log.clear()
+    put_response = client.put("/boards/1", json={"title": "Renamed"})
+    put_queries = list(query_log)
+    version = db.session.scalar(db.select(Board.version).where(Board.id == 1))
+
+    # Assert
+    assert post_response.status_code == 201
+    assert post_response.get_json() == {"id": 1, "title": "New", "owner": "Ada", "card_count": 0, "likes_total": 0}
+    assert [statement.split()[0] for statement in post_queries] == ["INSERT"]
+    assert put_response.status_code == 204
+    assert [statement.split()[0] for statement in put_queries] == ["UPDATE"]
+    assert version == 2
+    assert client.put("/boards/999", json={"title": "Renamed"}).status_code == 404
+    assert client.delete("/boards/999").status_code == 404
+
+
 # checks GET /boards/<board_id>/cards returns all cards for board
 def test_get_cards_for_board(client, one_board_one_card):
     # Arrange
@@ -90,4 +135,603 @@ def test_post_card_on_board(client, one_board):
     # Assert
     assert response.status_code == 201
     data = response.get_json()
-    assert data["message"] == "Be positive!"
\ No newline at end of file
+    assert data["message"] == "Be positive!"
+
+# checks GET /boards/with-cards issues the same number of queries for any board count
+def test_get_boards_with_cards_query_count_is_constant(client, query_log):
+    # Arrange
+    def create_boards(count):
+        for i in range(count):
+            board = Board(title=f"Board {i}", owner="Ada")
+            board.cards = [Card(message=f"Card {i}"), Card(message=f"Other {i}")]
+            db.session.add(board)
+        db.session.commit()
+
+    create_boards(2)
+    query_log.clear()
+    client.get("/boards/with-cards")
+    few_boards_queries = len(query_log)
+
+    create_boards(20)
+    query_log.clear()
+
+    # Act
+    response = client.get("/boards/with-cards")
+
+    # Assert
+    assert response.status_code == 200
+    assert len(response.get_json()) == 22
+    assert all(len(board["cards"]) == 2 for board in response.get_json())
+    assert len(query_log) == few_boards_queries
+
+
+# checks a PUT /boards/<board_id> that changes nothing keeps the board's ETag
+def test_put_board_without_changes(client, one_board):
+    # Arrange
+    board_id = one_board.id
+    etag = client.get(f"/boards/{board_id}").headers["ETag"]
+
+    # Act
+    response = client.put(f"/boards/{board_id}", json={"card_count": 5})
+
+    # Assert
+    assert response.status_code == 204
+    assert client.get(f"/boards/{board_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.put("/boards/999", json={}).status_code == 404
+
+
+# checks GET /boards/<board_id>/cards reads the board once, then only its cards
+def test_get_cards_for_board_single_query(client, three_cards, one_board, query_log):
+    # Arrange
+    board_id = one_board.id
+    query_log.clear()
+
+    # Act
+    response = client.get(f"/boards/{board_id}/cards")
+
+    # Assert
+    assert response.status_code == 200
+    assert len(response.get_json()["cards"]) == 3
+    assert len(query_log) == 2
+    assert query_log[0].count("FROM board") == 1
+    assert "FROM card" in query_log[1]
+    assert "board." not in query_log[1]
+
+
+# checks GET /boards pages through boards with the after/limit cursor
+def test_get_all_boards_paginated(client):
+    # Arrange
+    db.session.add_all([Board(title=f"Board {i}", owner="Ada") for i in range(5)])
+    db.session.commit()
+
+    # Act
+    first_page = client.get("/boards?limit=2")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/boards?after={cursor}&limit=2")
+    last_page = client.get(f"/boards?after={second_page.headers['X-Next-Cursor']}&limit=2")
+
+    # Assert
+    assert [board["title"] for board in first_page.get_json()] == ["Board 0", "Board 1"]
+    assert [board["title"] for board in second_page.get_json()] == ["Board 2", "Board 3"]
+    assert [board["title"] for board in last_page.get_json()] == ["Board 4"]
+    assert "X-Next-Cursor" not in last_page.headers
+    assert 'rel="next"' in first_page.headers["Link"]
+
+
+# checks GET /boards caps the page size at MAX_PAGE_SIZE
+def test_get_all_boards_limit_is_capped(app, client):
+    # Arrange
+    app.config["MAX_PAGE_SIZE"] = 3
+    db.session.add_all([Board(title=f"Board {i}", owner="Ada") for i in range(5)])
+    db.session.commit()
+
+    # Act
+    response = client.get("/boards?limit=1000")
+
+    # Assert
+    assert response.status_code == 200
+    assert len(response.get_json()) == 3
+    assert "X-Next-Cursor" in response.headers
+
+
+# checks GET /boards rejects a non-integer cursor
+def test_get_all_boards_invalid_cursor(client):
+    # Act
+    response = client.get("/boards?after=abc")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Query parameter after must be an integer"}
+
+
+# checks POST /boards/<board_id>/cards/assign moves cards and reports their previous board
+def test_reassign_cards_to_board(client, one_board, three_cards):
+    # Arrange
+    target = Board(title="Target", owner="Ada")
+    db.session.add(target)
+    db.session.commit()
+    target_id = target.id
+    source_id = one_board.id
+
+    # Act
+    response = client.post(f"/boards/{target_id}/cards/assign", json={"card_ids": [1, 3]})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["reassigned_cards"] == [
+        {"card_id": 1, "from_board": source_id, "to_board": target_id},
+        {"card_id": 3, "from_board": source_id, "to_board": target_id}
+    ]
+    moved = db.session.scalars(db.select(Card.id).where(Card.board_id == target_id)).all()
+    assert moved == [1, 3]
+
+
+# checks POST /boards/<board_id>/cards/assign reports every missing card and moves nothing
+def test_reassign_cards_missing_ids(client, one_board, three_cards):
+    # Arrange
+    target = Board(title="Target", owner="Ada")
+    db.session.add(target)
+    db.session.commit()
+    target_id = target.id
+    source_id = one_board.id
+
+    # Act
+    response = client.post(f"/boards/{target_id}/cards/assign", json={"card_ids": [1, 98, 99]})
+
+    # Assert
+    assert response.status_code == 404
+    assert response.get_json() == {
+        "message": "Card 98, 99 not found",
+        "missing_card_ids": [98, 99]
+    }
+    assert db.session.scalar(db.select(Card.board_id).where(Card.id == 1)) == source_id
+
+
+# checks reassigning many cards issues the same number of queries as reassigning a few
+def test_reassign_cards_query_count_is_constant(client, one_board, query_log):
+    # Arrange
+    db.session.add_all([Card(message=f"Card {i}", board_id=one_board.id) for i in range(50)])
+    target = Board(title="Target", owner="Ada")
+    db.session.add(target)
+    db.session.commit()
+    target_id = target.id
+
+    query_log.clear()
+    client.post(f"/boards/{target_id}/cards/assign", json={"card_ids": [1, 2]})
+    few_cards_queries = len(query_log)
+    query_log.clear()
+
+    # Act
+    response = client.post(f"/boards/{target_id}/cards/assign", json={"card_ids": list(range(1, 51))})
+
+    # Assert
+    assert response.status_code == 200
+    assert len(query_log) == few_cards_queries
+
+
+# checks GET /boards/<board_id>/cards answers 304 from the board version without loading cards
+def test_get_cards_for_board_not_modified(client, three_cards, one_board, query_log):
+    # Arrange
+    board_id = one_board.id
+    etag = client.get(f"/boards/{board_id}/cards").headers["ETag"]
+    query_log.clear()
+
+    # Act
+    response = client.get(f"/boards/{board_id}/cards", headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert len(query_log) == 1
+    assert "FROM card" not in query_log[0]
+    assert "JOIN card" not in query_log[0]
+
+
+# checks card changes give the board a new ETag
+def test_card_changes_update_board_etag(client, one_card):
+    # Arrange
+    board_id, card_id = one_card.board_id, one_card.id
+    etags = [client.get(f"/boards/{board_id}/cards").headers["ETag"]]
+
+    # Act
+    client.patch(f"/cards/{card_id}/like")
+    etags.append(client.get(f"/boards/{board_id}/cards").headers["ETag"])
+    client.put(f"/cards/{card_id}", json={"message": "Changed"})
+    etags.append(client.get(f"/boards/{board_id}/cards").headers["ETag"])
+    client.post(f"/boards/{board_id}/cards", json={"message": "New"})
+    etags.append(client.get(f"/boards/{board_id}/cards").headers["ETag"])
+    response = client.get(f"/boards/{board_id}/cards", headers={"If-None-Match": etags[0]})
+
+    # Assert
+    assert len(set(etags)) == 4
+    assert response.status_code == 200
+
+
+# checks GET /boards/with-cards revalidates with its ETag and a deleted board invalidates it
+def test_get_boards_with_cards_conditional(client, one_card):
+    # Arrange
+    board_id = one_card.board_id
+    client.post("/boards", json={"title": "Short-lived", "owner": "Grace"})
+    first = client.get("/boards/with-cards")
+
+    # Act
+    by_etag = client.get("/boards/with-cards", headers={"If-None-Match": first.headers["ETag"]})
+    client.put(f"/boards/{board_id}", json={"title": "Changed"})
+    after_change = client.get("/boards/with-cards", headers={"If-None-Match": first.headers["ETag"]})
+    client.delete("/boards/2")
+    after_delete = client.get("/boards/with-cards", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+
+    # Assert
+    assert by_etag.status_code == 304
+    assert "Last-Modified" not in first.headers
+    assert after_change.status_code == 200
+    assert after_change.get_json()[0]["title"] == "Changed"
+    assert after_delete.status_code == 200
+    assert [board["title"] for board in after_delete.get_json()] == ["Changed"]
+
+
+# checks GET /boards/<board_id>/events streams card changes on the board
+def test_stream_board_events(client, one_card):
+    # Arrange
+    board_id, card_id = one_card.board_id, one_card.id
+    response = client.get(f"/boards/{board_id}/events", buffered=False)
+    stream = iter(response.response)
+
+    # Act
+    preamble = next(stream)
+    client.patch(f"/cards/{card_id}/like")
+    client.post(f"/boards/{board_id}/cards", json={"message": "Fresh"})
+    chunks = [next(stream), next(stream)]
+    response.close()
+
+    # Assert
+    assert response.mimetype == "text/event-stream"
+    assert preamble == b"retry: 3000\n\n"
+    assert chunks[0].startswith(b"event: card.liked\n")
+    assert b'"likes_count": 1' in chunks[0]
+    assert chunks[1].startswith(b"event: card.created\n")
+    assert b'"message": "Fresh"' in chunks[1]
+
+
+# checks GET /boards/with-cards?stream=true matches the paged response, empty boards included
+def test_get_boards_with_cards_streamed(client, three_cards):
+    # Arrange
+    db.session.add(Board(title="Empty", owner="Ada"))
+    db.session.commit()
+
+    # Act
+    streamed = client.get("/boards/with-cards?stream=true").get_json()
+    paged = client.get("/boards/with-cards").get_json()
+    after_first = client.get("/boards/with-cards?stream=true&after=1").get_json()
+
+    # Assert
+    assert streamed == paged
+    assert [board["title"] for board in after_first] == ["Empty"]
+    assert after_first[0]["cards"] == []
+
+
+# checks POST /boards/<board_id>/cards/batch creates every card with one INSERT
+def test_create_cards_batch(client, one_board, query_log):
+    # Arrange
+    board_id = one_board.id
+    cards = [{"message": f"Idea {i}"} for i in range(25)]
+    query_log.clear()
+
+    # Act
+    response = client.post(f"/boards/{board_id}/cards/batch", json={"cards": cards})
+
+    # Assert
+    assert response.status_code == 201
+    data = response.get_json()
+    assert [card["message"] for card in data["cards"]] == [card["message"] for card in cards]
+    assert all(card["board_id"] == board_id and card["likes_count"] == 0 for card in data["cards"])
+    # SQLite doesn't promise RETURNING order, so SQLAlchemy inserts the rows one at a time there
+    expected_inserts = 1 if db.engine.dialect.name == "postgresql" else len(cards)
+    assert len([statement for statement in query_log if statement.startswith("INSERT INTO card ")]) == expected_inserts
+    assert db.session.scalar(db.select(db.func.count(Card.id))) == 25
+
+
+# checks POST /boards/<board_id>/cards/batch reports every invalid item and saves nothing
+def test_create_cards_batch_invalid_items(client, one_board):
+    # Arrange
+    board_id = one_board.id
+    cards = [{"message": "Fine"}, {"message": ""}, {}, {"message": "x" * 41}, "text"]
+
+    # Act
+    response = client.post(f"/boards/{board_id}/cards/batch", json={"cards": cards})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json()["errors"] == [
+        {"index": 1, "message": "The message field cannot be empty"},
+        {"index": 2, "message": "Missed required field: 'message'"},
+        {"index": 3, "message": "The message field shouldn't be greater than 40 characters"},
+        {"index": 4, "message": "Each item must be an object"}
+    ]
+    assert db.session.scalar(db.select(db.func.count(Card.id))) == 0
+
+
+# checks POST /boards/<board_id>/cards/batch enforces MAX_BATCH_SIZE
+def test_create_cards_batch_too_large(app, client, one_board):
+    # Arrange
+    app.config["MAX_BATCH_SIZE"] = 2
+    board_id = one_board.id
+
+    # Act
+    response = client.post(f"/boards/{board_id}/cards/batch", json={"cards": [{"message": "a"}] * 3})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "A batch can't have more than 2 cards"}
+
+# checks GET /boards/export streams boards and cards that POST /boards/import loads back with new ids
+def test_export_import_ndjson_round_trip(client, three_cards):
+    # Arrange
+    export = client.get("/boards/export")
+    lines = export.get_data(as_text=True).splitlines()
+
+    # Act
+    response = client.post("/boards/import", data="\n".join(lines), content_type="application/x-ndjson")
+
+    # Assert
+    assert export.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["type"] for line in lines] == ["board", "card", "card", "card"]
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["boards"] == 1
+    assert data["cards"] == 3
+    assert "rows_per_second" in data
+    boards = db.session.scalars(db.select(Board).order_by(Board.id)).all()
+    assert len(boards) == 2
+    assert [card.message for card in boards[1].cards] == [card.message for card in boards[0].cards]
+
+# checks the CSV export can be imported again
+def test_export_import_csv_round_trip(client, one_card):
+    # Arrange
+    export = client.get("/boards/export?format=csv")
+    body = export.get_data(as_text=True)
+
+    # Act
+    response = client.post("/boards/import", data=body, content_type="text/csv")
+
+    # Assert
+    assert export.mimetype == "text/csv"
+    assert body.splitlines()[0] == "type,id,board_id,title,owner,message,likes_count"
+    assert response.status_code == 201
+    assert response.get_json()["cards"] == 1
+    assert db.session.scalar(db.select(db.func.count(Card.id))) == 2
+
+# checks POST /boards/import saves nothing when a record is invalid and names its line
+def test_import_invalid_record_saves_nothing(client):
+    # Arrange
+    body = "\n".join([
+        json.dumps({"type": "board", "id": 1, "title": "Ideas", "owner": "Ana"}),
+        json.dumps({"type": "card", "board_id": 1, "message": "ok"}),
+        json.dumps({"type": "card", "board_id": 1, "message": "x" * 41}),
+    ])
+
+    # Act
+    response = client.post("/boards/import", data=body)
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json()["message"].startswith("Line 3:")
+    assert db.session.scalar(db.select(db.func.count(Board.id))) == 0
+
+# checks a CSV card with a non-numeric likes_count is a 400 naming its line
+def test_import_csv_invalid_likes_count(client):
+    # Arrange
+    body = "\n".join([
+        "type,id,board_id,title,owner,message,likes_count",
+        "board,1,,Ideas,Ana,,",
+        "card,1,1,,,ok,many",
+    ])
+
+    # Act
+    response = client.post("/boards/import", data=body, content_type="text/csv")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json()["message"].startswith("Line 3:")
+    assert db.session.scalar(db.select(db.func.count(Board.id))) == 0
+
+# checks the import writes cards in chunks of IMPORT_CHUNK_SIZE rows
+def test_import_inserts_cards_in_chunks(app, client, query_log):
+    # Arrange
+    app.config["IMPORT_CHUNK_SIZE"] = 2
+    records = [{"type": "board", "id": 7, "title": "Ideas", "owner": "Ana"}]
+    records += [{"type": "card", "board_id": 7, "message": f"card {i}"} for i in range(5)]
+    body = "\n".join(json.dumps(record) for record in records)
+
+    # Act
+    response = client.post("/boards/import", data=body)
+
+    # Assert
+    assert response.status_code == 201
+    card_inserts = [statement for statement in query_log if statement.startswith("INSERT INTO card")]
+    assert len(card_inserts) == 3
+
+# checks `flask boards export` and `flask boards import` round trip through a file
+def test_boards_cli_export_import(app, three_cards, tmp_path):
+    # Arrange
+    runner = app.test_cli_runner()
+    export_path = tmp_path / "boards.csv"
+
+    # Act
+    export_result = runner.invoke(args=["boards", "export", str(export_path), "--format", "csv"])
+    import_result = runner.invoke(args=["boards", "import", str(export_path)])
+
+    # Assert
+    assert export_result.exit_code == 0
+    assert import_result.exit_code == 0
+    assert "Imported 1 board(s) and 3 card(s)" in import_result.output
+    assert db.session.scalar(db.select(db.func.count(Card.id))) == 6
+
+# checks card_count and likes_total follow card creates, likes, moves and deletes
+def test_board_counts_follow_card_changes(client, one_board):
+    # Arrange
+    board_id = one_board.id
+    other_board_id = client.post("/boards", json={"title": "Other", "owner": "Ana"}).get_json()["id"]
+    first_id = client.post(f"/boards/{board_id}/cards", json={"message": "First"}).get_json()["id"]
+    batch = client.post(f"/boards/{board_id}/cards/batch", json={"cards": [{"message": "Second"}, {"message": "Third"}]})
+    second_id, third_id = [card["id"] for card in batch.get_json()["cards"]]
+    client.patch(f"/cards/{first_id}/like")
+    client.patch(f"/cards/{first_id}/like")
+    client.patch(f"/cards/{second_id}/like")
+
+    # Act
+    before_move = client.get(f"/boards/{board_id}").get_json()["board"]
+    client.post(f"/boards/{other_board_id}/cards/assign", json={"card_ids": [first_id]})
+    client.delete(f"/cards/{third_id}")
+    client.delete("/cards/batch", json={"card_ids": [second_id]})
+    board = client.get(f"/boards/{board_id}").get_json()["board"]
+    other_board = client.get(f"/boards/{other_board_id}").get_json()["board"]
+
+    # Assert
+    assert (before_move["card_count"], before_move["likes_total"]) == (3, 3)
+    assert (board["card_count"], board["likes_total"]) == (0, 0)
+    assert (other_board["card_count"], other_board["likes_total"]) == (1, 2)
+
+# checks `flask boards reconcile` repairs counts that drifted from the cards
+def test_boards_cli_reconcile(app, three_cards, one_board):
+    # Arrange
+    board_id = one_board.id
+    db.session.execute(db.update(Board).values(card_count=99, likes_total=-1))
+    db.session.execute(db.update(Card).where(Card.board_id == board_id).values(likes_count=2))
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    # Act
+    result = runner.invoke(args=["boards", "reconcile"])
+    second_result = runner.invoke(args=["boards", "reconcile"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert f"Fixed counts on 1 board(s): {board_id}" in result.output
+    assert "All board counts are correct" in second_result.output
+    board = db.session.get(Board, board_id)
+    db.session.refresh(board)
+    assert (board.card_count, board.likes_total) == (3, 6)
+
+
+# checks GET /boards/<board_id>/changes returns only the cards changed since a version
+def test_get_board_changes(client, one_board):
+    # Arrange
+    board_id = one_board.id
+    other_board_id = client.post("/boards", json={"title": "Other", "owner": "Grace"}).get_json()["id"]
+    kept_id = client.post(f"/boards/{board_id}/cards", json={"message": "Kept"}).get_json()["id"]
+    edited_id = client.post(f"/boards/{board_id}/cards", json={"message": "Edit me"}).get_json()["id"]
+    deleted_id = client.post(f"/boards/{board_id}/cards", json={"message": "Delete me"}).get_json()["id"]
+    moved_id = client.post(f"/boards/{board_id}/cards", json={"message": "Move me"}).get_json()["id"]
+    since = int(client.get(f"/boards/{board_id}/cards").headers["Board-Version"])
+
+    client.put(f"/cards/{edited_id}", json={"message": "Edited"})
+    client.patch(f"/cards/{edited_id}/like")
+    client.delete(f"/cards/{deleted_id}")
+    client.post(f"/boards/{other_board_id}/cards/assign", json={"card_ids": [moved_id]})
+    new_id = client.post(f"/boards/{board_id}/cards", json={"message": "New"}).get_json()["id"]
+
+    # Act
+    response = client.get(f"/boards/{board_id}/changes?since={since}")
+    data = response.get_json()
+    unchanged = client.get(f"/boards/{board_id}/changes?since={data['version']}").get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert data["version"] == since + 5
+    assert data["board"]["card_count"] == 3
+    assert data["cards"] == [
+        {"id": edited_id, "message": "Edited", "likes_count": 1, "board_id": board_id},
+        {"id": new_id, "message": "New", "likes_count": 0, "board_id": board_id}
+    ]
+    assert data["deleted_card_ids"] == [deleted_id, moved_id]
+    assert kept_id not in data["deleted_card_ids"]
+    assert (unchanged["cards"], unchanged["deleted_card_ids"]) == ([], [])
+    assert client.get(f"/boards/{board_id}/changes").status_code == 400
+    assert client.get("/boards/999/changes?since=0").status_code == 404
+
+
+# checks `flask boards compact-changes` keeps only the latest change of each card
+def test_boards_cli_compact_changes(app, client, one_card):
+    # Arrange
+    board_id, card_id = one_card.board_id, one_card.id
+    for _ in range(3):
+        client.patch(f"/cards/{card_id}/like")
+    before = client.get(f"/boards/{board_id}/changes?since=0").get_json()
+    runner = app.test_cli_runner()
+
+    # Act
+    result = runner.invoke(args=["boards", "compact-changes"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "Removed 2 superseded card change(s)" in result.output
+    assert db.session.scalar(db.select(db.func.count(CardChange.id))) == 1
+    assert client.get(f"/boards/{board_id}/changes?since=0").get_json() == before
+
+
+# checks GET /boards/<board_id>/cards?top=N returns the board with its N most liked cards in two queries
+def test_get_cards_by_board_top(client, three_cards, one_board, query_log):
+    # Arrange
+    board_id = one_board.id
+    query_log.clear()
+
+    # Act
+    top = client.get(f"/boards/{board_id}/cards?top=2")
+    top_queries = list(query_log)
+    by_message = client.get(f"/boards/{board_id}/cards?sort=message&order=desc")
+
+    # Assert
+    assert top.status_code == 200
+    assert top.get_json()["id"] == board_id
+    assert [card["likes_count"] for card in top.get_json()["cards"]] == [2, 1]
+    # The board row, then its cards
+    assert [statement.split()[0] for statement in top_queries] == ["SELECT", "SELECT"]
+    assert [card["message"] for card in by_message.get_json()["cards"]] == ["You matter", "Stay curious", "Keep going"]
+
+# checks GET /boards/with-cards?compact=true returns cards as columns without the repeated board_id
+def test_get_boards_with_cards_compact(client, three_cards, one_board):
+    # Arrange
+    board_id = one_board.id
+    expected_cards = {"id": [1, 2, 3], "message": ["Keep going", "You matter", "Stay curious"]}
+
+    # Act
+    paged = client.get("/boards/with-cards?compact=true&fields=id,message,board_id").get_json()
+    streamed = client.get("/boards/with-cards?compact=true&fields=id,message&stream=true").get_json()
+    by_board = client.get(f"/boards/{board_id}/cards?compact=true&fields=id,message").get_json()
+
+    # Assert
+    assert paged[0]["id"] == board_id
+    assert paged[0]["cards"] == expected_cards
+    assert streamed == paged
+    assert by_board["cards"] == expected_cards
+
+# checks GET /boards/with-cards?fields= limits the nested card fields, streamed or not
+def test_get_boards_with_cards_sparse_fields(client, three_cards):
+    # Act
+    paged = client.get("/boards/with-cards?fields=message").get_json()
+    streamed = client.get("/boards/with-cards?fields=message&stream=true").get_json()
+    boards = client.get("/boards?fields=title").get_json()
+
+    # Assert
+    assert paged[0]["cards"] == [{"message": "Keep going"}, {"message": "You matter"}, {"message": "Stay curious"}]
+    assert streamed == paged
+    assert list(boards[0]) == ["title"]
+
+# checks the core and ORM read paths return the same list responses
+@pytest.mark.parametrize("url", [
+    "/boards", "/boards?fields=title", "/boards/with-cards", "/boards/with-cards?compact=true&fields=message",
+    "/cards?limit=2", "/cards?fields=message&sort=likes&limit=2", "/cards?top=2&fields=likes_count",
+])
+def test_read_paths_match(app, client, three_cards, url):
+    # Act
+    app.config["READ_PATH"] = "orm"
+    orm_response = client.get(url)
+    app.config["READ_PATH"] = "core"
+    core_response = client.get(url)
+
+    # Assert
+    assert core_response.status_code == 200
+    assert core_response.get_json() == orm_response.get_json()
+    assert core_response.headers.get("X-Next-Cursor") == orm_response.headers.get("X-Next-Cursor")
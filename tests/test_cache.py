@@ -0,0 +1,191 @@
+import pytest
+from app.cache import MemoryBackend, ResponseCache
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+
+
+@pytest.fixture
+def cached_client(app):
+    app.extensions["response_cache"] = ResponseCache(MemoryBackend(), ttl=60)
+    return app.test_client()
+
+
+# checks a repeated GET is served from the cache without querying the database
+def test_get_served_from_cache(cached_client, one_card, query_log):
+    # Arrange
+    card_id = one_card.id
+    first = cached_client.get(f"/cards/{card_id}")
+    query_log.clear()
+
+    # Act
+    second = cached_client.get(f"/cards/{card_id}")
+
+    # Assert
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert query_log == []
+
+
+# checks card writes invalidate the card, the card list and its board's card list
+@pytest.mark.parametrize("write", [
+    lambda client, card_id: client.put(f"/cards/{card_id}", json={"message": "Changed"}),
+    lambda client, card_id: client.patch(f"/cards/{card_id}/like"),
+    lambda client, card_id: client.delete(f"/cards/{card_id}"),
+])
+def test_card_writes_invalidate(cached_client, one_card, write):
+    # Arrange
+    card_id, board_id = one_card.id, one_card.board_id
+    urls = [f"/cards/{card_id}", "/cards", f"/boards/{board_id}/cards", "/boards/with-cards"]
+    before = [cached_client.get(url).get_data() for url in urls]
+
+    # Act
+    write(cached_client, card_id)
+
+    # Assert
+    for url, old_body in zip(urls, before):
+        response = cached_client.get(url)
+        assert response.headers.get("X-Cache") != "HIT"
+        assert response.get_data() != old_body
+
+
+# checks card updates give a cached GET /boards/<board_id> the board's new ETag
+@pytest.mark.parametrize("write", [
+    lambda client, card_id: client.put(f"/cards/{card_id}", json={"message": "Changed"}),
+    lambda client, card_id: client.patch("/cards/batch", json={"cards": [{"id": card_id, "message": "Changed"}]}),
+])
+def test_card_updates_invalidate_board(cached_client, one_card, write):
+    # Arrange
+    card_id, board_id = one_card.id, one_card.board_id
+    before = cached_client.get(f"/boards/{board_id}")
+
+    # Act
+    write(cached_client, card_id)
+    after = cached_client.get(f"/boards/{board_id}")
+
+    # Assert
+    assert after.headers["X-Cache"] == "MISS"
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.headers["ETag"] == cached_client.get(f"/boards/{board_id}/cards").headers["ETag"]
+
+
+# checks writes leave unrelated cached responses alone
+def test_unrelated_entries_stay_cached(cached_client, one_card):
+    # Arrange
+    other = Board(title="Other", owner="Ada")
+    db.session.add(other)
+    db.session.commit()
+    other_id, card_id = other.id, one_card.id
+    cached_client.get(f"/boards/{other_id}")
+    cached_client.get(f"/boards/{other_id}/cards")
+
+    # Act
+    cached_client.patch(f"/cards/{card_id}/like")
+
+    # Assert
+    assert cached_client.get(f"/boards/{other_id}").headers["X-Cache"] == "HIT"
+    assert cached_client.get(f"/boards/{other_id}/cards").headers["X-Cache"] == "HIT"
+
+
+# checks board writes invalidate board listings and reassignments invalidate both boards
+def test_board_writes_invalidate(cached_client, one_card):
+    # Arrange
+    board_id, card_id = one_card.board_id, one_card.id
+    cached_client.get("/boards")
+    cached_client.get(f"/boards/{board_id}")
+    new_board_id = cached_client.post("/boards", json={"title": "New", "owner": "Ada"}).get_json()["id"]
+    cached_client.get(f"/boards/{new_board_id}/cards")
+    cached_client.get(f"/boards/{board_id}/cards")
+
+    # Act
+    cached_client.post(f"/boards/{new_board_id}/cards/assign", json={"card_ids": [card_id]})
+    cached_client.put(f"/boards/{board_id}", json={"title": "Renamed"})
+
+    # Assert
+    assert len(cached_client.get("/boards").get_json()) == 2
+    assert cached_client.get(f"/boards/0{board_id}").get_json()["board"]["title"] == "Renamed"
+    assert cached_client.get(f"/boards/{board_id}/cards").get_json()["cards"] == []
+    assert len(cached_client.get(f"/boards/{new_board_id}/cards").get_json()["cards"]) == 1
+
+
+# checks deleting a board drops its cards from the cache without reading the card ids
+def test_delete_board_invalidates_its_cards(cached_client, one_card, query_log):
+    # Arrange
+    board_id, card_id = one_card.board_id, one_card.id
+    cached_client.get(f"/cards/{card_id}")
+    query_log.clear()
+
+    # Act
+    cached_client.delete(f"/boards/{board_id}")
+    delete_queries = list(query_log)
+
+    # Assert
+    assert cached_client.get(f"/cards/{card_id}").status_code == 404
+    assert [statement.split()[0] for statement in delete_queries] == ["DELETE"]
+
+
+# checks the memory backend evicts least recently used entries and expires old ones
+def test_memory_backend_lru_and_ttl():
+    # Arrange
+    backend = MemoryBackend(max_entries=2)
+
+    # Act
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    backend.get("a")
+    backend.set("c", 3, ttl=60)
+    backend.set("c", 4, ttl=-1)
+
+    # Assert
+    assert backend.get("a") == 1
+    assert backend.get("b") is None
+    assert backend.get("c") is None
+
+
+# checks a cached response still answers conditional requests with 304
+def test_cache_hit_honors_if_none_match(cached_client, one_card):
+    # Arrange
+    board_id = one_card.board_id
+    etag = cached_client.get(f"/boards/{board_id}/cards").headers["ETag"]
+
+    # Act
+    response = cached_client.get(f"/boards/{board_id}/cards", headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.status_code == 304
+
+
+# checks `flask boards import` invalidates the cached board and card lists (of a shared backend in production)
+def test_cli_import_invalidates(app, cached_client, tmp_path):
+    # Arrange
+    import_path = tmp_path / "boards.ndjson"
+    import_path.write_text('{"type": "board", "id": 1, "title": "Imported", "owner": "Ana"}\n')
+    before = cached_client.get("/boards")
+    cached_client.get("/boards")
+
+    # Act
+    result = app.test_cli_runner().invoke(args=["boards", "import", str(import_path)])
+    after = cached_client.get("/boards")
+
+    # Assert
+    assert result.exit_code == 0
+    assert before.get_json() == []
+    assert after.headers.get("X-Cache") != "HIT"
+    assert [board["title"] for board in after.get_json()] == ["Imported"]
+
+
+# checks the CLI warns that a memory cache can't be invalidated in the running servers
+def test_cli_import_warns_about_memory_cache(app, tmp_path):
+    # Arrange
+    app.config["CACHE_BACKEND"] = "memory"
+    import_path = tmp_path / "boards.ndjson"
+    import_path.write_text('{"type": "board", "id": 1, "title": "Imported", "owner": "Ana"}\n')
+
+    # Act
+    result = app.test_cli_runner().invoke(args=["boards", "import", str(import_path)])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "Warning: CACHE_BACKEND=memory" in result.output
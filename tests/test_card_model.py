@@ -1,3 +1,5 @@
+import pytest
+from sqlalchemy import text
 from app.models.card import Card
 from app.models.board import Board
 from app.db import db
@@ -64,3 +66,48 @@ def test_update_card_from_dict(app):
     # Assert
     assert card.message == "New message"
     assert card.likes_count == 0
+
+def explain(query):
+    # Returns the query plan as text for the active database
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SET enable_seqscan = off"))
+        rows = db.session.execute(text(f"EXPLAIN {query}")).scalars()
+    else:
+        rows = (row.detail for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+    return "\n".join(rows)
+
+def test_cards_by_board_use_board_id_index(app):
+    # Act
+    plan = explain("SELECT id, message FROM card WHERE board_id = 1")
+
+    # Assert
+    assert "ix_card_board_id" in plan
+
+def test_message_search_uses_trigram_index(app):
+    if db.engine.dialect.name != "postgresql":
+        pytest.skip("Trigram indexes are only created on Postgres")
+
+    # Act
+    plan = explain("SELECT id FROM card WHERE message ILIKE '%going%'")
+
+    # Assert
+    assert "ix_card_message_trgm" in plan
+
+def test_top_cards_by_board_use_likes_index(app):
+    # Act
+    plan = explain(
+        "SELECT id, message, likes_count FROM card WHERE board_id = 1 "
+        "ORDER BY likes_count DESC, id LIMIT 10"
+    )
+
+    # Assert
+    assert "ix_card_board_id_likes_count_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_top_cards_overall_use_likes_index(app):
+    # Act
+    plan = explain("SELECT id FROM card ORDER BY likes_count DESC, id LIMIT 10")
+
+    # Assert
+    assert "ix_card_likes_count_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -1,4 +1,12 @@
 import json
+import time
+import tracemalloc
+from sqlalchemy import insert
+from threading import Thread
+from app.db import db
+from app.likes import LikeBuffer
+from app.models.board import Board
+from app.models.card import Card
 
 # checks GET /cards/<card_id> returns the correct card
 def test_get_one_card(client, one_card):
@@ -55,6 +63,70 @@ def test_delete_card(client, one_card):
     # Assert
     assert response.status_code == 204
 
+
+# checks PUT and DELETE /cards/<card_id> change the card without reading it first
+def test_card_writes_skip_the_read(client, one_card, query_log):
+    # Arrange
+    card_id = one_card.id
+    query_log.clear()
+
+    # Act
+    put_response = client.put(f"/cards/{card_id}", json={"message": "Updated Message"})
+    put_queries = list(query_log)
+    message = db.session.scalar(db.select(Card.message).where(Card.id == card_id))
+    query_log.clear()
+    delete_response = client.delete(f"/cards/{card_id}")
+
+    # Assert
+    assert put_response.status_code == 204
+    assert delete_response.status_code == 204
+    assert message == "Updated Message"
+    # The card statement, the board's version and counts, then the change log
+    assert [statement.split()[:3] for statement in put_queries] == [
+        ["UPDATE", "card", "SET"], ["UPDATE", "board", "SET"], ["INSERT", "INTO", "card_change"]
+    ]
+    assert [statement.split()[:3] for statement in query_log] == [
+        ["DELETE", "FROM", "card"], ["UPDATE", "board", "SET"], ["INSERT", "INTO", "card_change"]
+    ]
+
+
+# checks a PUT /cards/<card_id> that changes nothing leaves the board's version and change log alone
+def test_put_card_without_changes(client, one_card, query_log):
+    # Arrange
+    card_id, board_id = one_card.id, one_card.board_id
+    version = client.get(f"/boards/{board_id}/cards").headers["Board-Version"]
+    query_log.clear()
+
+    # Act
+    response = client.put(f"/cards/{card_id}", json={"likes_count": 99})
+    missing = client.put("/cards/999", json={})
+
+    # Assert
+    assert response.status_code == 204
+    assert missing.status_code == 404
+    assert [statement.split()[:2] for statement in query_log] == [["UPDATE", "card"], ["UPDATE", "card"]]
+    assert client.get(f"/boards/{board_id}/cards").headers["Board-Version"] == version
+    assert client.get(f"/boards/{board_id}/changes?since={version}").get_json()["cards"] == []
+
+
+# checks PUT and DELETE /cards/<card_id> answer 404 for a missing card and 400 for an invalid message
+def test_card_write_errors(client, one_card):
+    # Arrange
+    card_id = one_card.id
+
+    # Act
+    put_missing = client.put("/cards/999", json={"message": "Updated Message"})
+    delete_missing = client.delete("/cards/999")
+    put_invalid = client.put(f"/cards/{card_id}", json={"message": "x" * 41})
+
+    # Assert
+    assert put_missing.status_code == 404
+    assert put_missing.get_json() == {"message": "Card 999 not found"}
+    assert delete_missing.status_code == 404
+    assert put_invalid.status_code == 400
+    assert put_invalid.get_json() == {"message": "The message field shouldn't be greater than 40 characters"}
+
+
 # checks PATCH /cards/<card_id>/like increases likes_count
 def test_patch_like_card(client, one_card):
     # Arrange
@@ -67,3 +139,266 @@ def test_patch_like_card(client, one_card):
     assert response.status_code == 200
     data = response.get_json()
     assert data["likes_count"] == 1
+
+
+# checks GET /cards pages through cards with the after/limit cursor
+def test_get_all_cards_paginated(client, three_cards):
+    # Act
+    first_page = client.get("/cards?limit=2")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/cards?after={cursor}&limit=2")
+
+    # Assert
+    assert [card["message"] for card in first_page.get_json()] == ["Keep going", "You matter"]
+    assert [card["message"] for card in second_page.get_json()] == ["Stay curious"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+# checks GET /cards?sort=likes pages through cards most liked first with a value,id cursor
+def test_get_all_cards_sorted_by_likes_paginated(client, three_cards):
+    # Act
+    first_page = client.get("/cards?sort=likes&limit=2")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/cards?sort=likes&after={cursor}&limit=2")
+    ascending = client.get("/cards?sort=message&order=asc")
+
+    # Assert
+    assert [card["likes_count"] for card in first_page.get_json()] == [2, 1]
+    assert cursor == f"1,{first_page.get_json()[1]['id']}"
+    assert [card["likes_count"] for card in second_page.get_json()] == [0]
+    assert "X-Next-Cursor" not in second_page.headers
+    assert [card["message"] for card in ascending.get_json()] == ["Keep going", "Stay curious", "You matter"]
+
+
+# checks GET /cards?top=N returns the N most liked cards and rejects unknown sorts
+def test_get_all_cards_top(client, three_cards):
+    # Act
+    response = client.get("/cards?top=2")
+    invalid = client.get("/cards?sort=board")
+
+    # Assert
+    assert [card["message"] for card in response.get_json()] == ["You matter", "Stay curious"]
+    assert invalid.status_code == 400
+    assert invalid.get_json() == {"message": "Query parameter sort must be one of: id, likes, message"}
+
+
+# checks GET /cards/top ranks cards across boards and names their board
+def test_get_top_cards(client, three_cards, one_board):
+    # Arrange
+    board_title = one_board.title
+
+    # Act
+    response = client.get("/cards/top?limit=1")
+
+    # Assert
+    assert response.status_code == 200
+    assert [(card["message"], card["likes_count"], card["board_title"]) for card in response.get_json()] == [
+        ("You matter", 2, board_title)
+    ]
+
+# checks PATCH /cards/<card_id>/like returns 404 for a missing card
+def test_patch_like_missing_card(client):
+    # Act
+    response = client.patch("/cards/999/like")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.get_json() == {"message": "Card 999 not found"}
+
+
+def like_concurrently(app, card_id, threads=8, likes_per_thread=10):
+    def like_many():
+        client = app.test_client()
+        for _ in range(likes_per_thread):
+            assert client.patch(f"/cards/{card_id}/like").status_code == 200
+
+    workers = [Thread(target=like_many) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def create_card(app):
+    board = Board(title="Hot", owner="Ada")
+    card = Card(message="Popular", board=board)
+    db.session.add(card)
+    db.session.commit()
+    return card.id
+
+
+# checks concurrent likes on the same card are never lost
+def test_concurrent_likes_are_not_lost(threaded_app):
+    # Arrange
+    card_id = create_card(threaded_app)
+
+    # Act
+    like_concurrently(threaded_app, card_id)
+
+    # Assert
+    likes = db.session.scalar(db.select(Card.likes_count).where(Card.id == card_id))
+    assert likes == 80
+
+
+# checks buffered likes are coalesced and all written once flushed
+def test_buffered_concurrent_likes_are_not_lost(threaded_app, query_log):
+    # Arrange
+    like_buffer = LikeBuffer(flush_threshold=25, flush_interval=60)
+    threaded_app.extensions["like_buffer"] = like_buffer
+    card_id = create_card(threaded_app)
+
+    # Act
+    like_concurrently(threaded_app, card_id)
+    like_buffer.flush()
+
+    # Assert
+    likes = db.session.scalar(db.select(Card.likes_count).where(Card.id == card_id))
+    assert likes == 80
+    assert like_buffer.pending(card_id) == 0
+    updates = [statement for statement in query_log if statement.startswith("UPDATE")]
+    assert len(updates) < 80
+
+
+# checks buffered likes are written on the flush interval without another like arriving
+def test_buffered_likes_are_flushed_on_a_timer(threaded_app):
+    # Arrange
+    like_buffer = LikeBuffer(flush_threshold=100, flush_interval=0.05, app=threaded_app)
+    threaded_app.extensions["like_buffer"] = like_buffer
+    card_id = create_card(threaded_app)
+    client = threaded_app.test_client()
+
+    # Act
+    client.patch(f"/cards/{card_id}/like")
+    deadline = time.monotonic() + 5
+    likes = 0
+    while likes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        db.session.rollback()
+        likes = db.session.scalar(db.select(Card.likes_count).where(Card.id == card_id))
+
+    # Assert
+    assert likes == 1
+    assert like_buffer.pending(card_id) == 0
+
+
+# checks GET /cards?stream=true returns the same cards as the paged response
+def test_get_all_cards_streamed(client, three_cards):
+    # Act
+    streamed = client.get("/cards?stream=true")
+    is_streamed = streamed.is_streamed
+    streamed_cards = streamed.get_json()
+    paged = client.get("/cards")
+
+    # Assert
+    assert streamed.status_code == 200
+    assert is_streamed
+    assert streamed_cards == paged.get_json()
+
+
+# checks GET /cards?stream=true streams in the requested sort order and takes the paged cursors
+def test_get_all_cards_streamed_sorted(client, three_cards):
+    # Arrange
+    cursor = client.get("/cards?sort=likes&limit=1").headers["X-Next-Cursor"]
+
+    # Act
+    by_likes = client.get("/cards?stream=true&sort=likes").get_json()
+    after_cursor = client.get(f"/cards?stream=true&sort=likes&after={cursor}").get_json()
+    by_message = client.get("/cards?stream=true&sort=message&order=desc").get_json()
+
+    # Assert
+    assert [card["likes_count"] for card in by_likes] == [2, 1, 0]
+    assert [card["likes_count"] for card in after_cursor] == [1, 0]
+    assert [card["message"] for card in by_message] == ["You matter", "Stay curious", "Keep going"]
+
+
+def measure_stream(client, url):
+    tracemalloc.start()
+    response = client.get(url, buffered=False)
+    payload_size = sum(len(chunk) for chunk in response.response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response.close()
+    return payload_size, peak
+
+
+# checks streaming 5x the cards doesn't grow peak memory (benchmarks.stream_cards measures 100k)
+def test_get_all_cards_streamed_memory_is_constant(app, client, one_board):
+    # Arrange
+    board_id = one_board.id
+    app.config["STREAM_BATCH_SIZE"] = 100
+    db.session.execute(insert(Card.__table__), [
+        {"message": f"Card number {i}", "likes_count": i % 7, "board_id": board_id}
+        for i in range(10_000)
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+    # Compile the query and set up the request machinery outside the measurement
+    client.get("/cards?stream=true&limit=1")
+
+    # Act
+    small_payload, small_peak = measure_stream(client, "/cards?stream=true&limit=2000")
+    payload_size, peak = measure_stream(client, "/cards?stream=true")
+
+    # Assert
+    assert payload_size > 4 * small_payload
+    assert peak < small_peak * 1.5
+
+
+# checks PATCH /cards/batch updates every card with one executemany
+def test_update_cards_batch(client, three_cards, query_log):
+    # Arrange
+    updates = [{"id": 1, "message": "First"}, {"id": 3, "message": "Third"}]
+    query_log.clear()
+
+    # Act
+    response = client.patch("/cards/batch", json={"cards": updates})
+
+    # Assert
+    assert response.status_code == 200
+    assert [card["message"] for card in response.get_json()["cards"]] == ["First", "Third"]
+    messages = db.session.scalars(db.select(Card.message).order_by(Card.id)).all()
+    assert messages == ["First", "You matter", "Third"]
+    assert len([statement for statement in query_log if statement.startswith("UPDATE card")]) == 1
+
+
+# checks PATCH /cards/batch rejects the batch when a card is missing or a message is invalid
+def test_update_cards_batch_errors(client, three_cards):
+    # Act
+    missing = client.patch("/cards/batch", json={"cards": [{"id": 1, "message": "Ok"}, {"id": 99, "message": "No"}]})
+    invalid = client.patch("/cards/batch", json={"cards": [{"id": 1, "message": " "}]})
+
+    # Assert
+    assert missing.status_code == 404
+    assert missing.get_json()["missing_card_ids"] == [99]
+    assert invalid.status_code == 400
+    assert invalid.get_json()["errors"] == [{"index": 0, "message": "The message field cannot be empty"}]
+    assert db.session.scalar(db.select(Card.message).where(Card.id == 1)) == "Keep going"
+
+
+# checks DELETE /cards/batch deletes all cards in one statement or none when one is missing
+def test_delete_cards_batch(client, three_cards):
+    # Act
+    missing = client.delete("/cards/batch", json={"card_ids": [1, 99]})
+    deleted = client.delete("/cards/batch", json={"card_ids": [1, 2]})
+
+    # Assert
+    assert missing.status_code == 404
+    assert missing.get_json()["missing_card_ids"] == [99]
+    assert deleted.status_code == 200
+    assert deleted.get_json() == {"deleted_card_ids": [1, 2]}
+    assert db.session.scalars(db.select(Card.id)).all() == [3]
+
+
+# checks GET /cards?fields= returns and selects only the requested columns
+def test_get_all_cards_sparse_fields(client, three_cards, query_log):
+    # Act
+    response = client.get("/cards?fields=id,message")
+    invalid = client.get("/cards?fields=id,secret")
+
+    # Assert
+    assert response.get_json()[0] == {"id": 1, "message": "Keep going"}
+    select = next(statement for statement in query_log if statement.startswith("SELECT"))
+    assert "likes_count" not in select
+    assert "board_id" not in select
+    assert invalid.status_code == 400
+    assert invalid.get_json() == {"message": "Query parameter fields must be a subset of: id, message, likes_count, board_id"}
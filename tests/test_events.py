@@ -0,0 +1,47 @@
+from app.events import EventBroker
+
+
+# checks events are delivered to every subscriber of the channel only
+def test_broker_fans_out_by_channel():
+    # Arrange
+    broker = EventBroker()
+    first = broker.subscribe("board:1")
+    second = broker.subscribe("board:1")
+    other = broker.subscribe("board:2")
+
+    # Act
+    broker.publish("board:1", {"type": "card.liked"})
+
+    # Assert
+    assert first.get(timeout=0) == [{"type": "card.liked"}]
+    assert second.get(timeout=0) == [{"type": "card.liked"}]
+    assert other.get(timeout=0) == []
+
+
+# checks a slow subscriber keeps only the newest events and counts the dropped ones
+def test_subscription_buffer_is_bounded():
+    # Arrange
+    broker = EventBroker(max_events=3)
+    subscription = broker.subscribe("board:1")
+
+    # Act
+    for number in range(10):
+        broker.publish("board:1", {"number": number})
+
+    # Assert
+    assert subscription.get(timeout=0) == [{"number": 7}, {"number": 8}, {"number": 9}]
+    assert subscription.dropped == 7
+
+
+# checks unsubscribed subscribers stop receiving events
+def test_unsubscribe():
+    # Arrange
+    broker = EventBroker()
+    subscription = broker.subscribe("board:1")
+
+    # Act
+    broker.unsubscribe(subscription)
+    broker.publish("board:1", {"type": "card.liked"})
+
+    # Assert
+    assert subscription.get(timeout=0) == []
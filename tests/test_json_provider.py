@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime, timezone
+from app import create_app
+from app.db import db
+from app.json_provider import JSONProvider, OrjsonProvider
+from app.models.card import Card
+
+
+# checks the orjson provider writes the same JSON as the stdlib provider
+def test_orjson_matches_stdlib(app):
+    # Arrange
+    data = {
+        "b": [1, 2.5, None, True],
+        "a": {"nested": "é", "n": 3},
+        "when": datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+    }
+
+    # Act
+    stdlib = JSONProvider(app).dumps(data)
+    fast = OrjsonProvider(app).dumps(data)
+
+    # Assert
+    assert OrjsonProvider(app).loads(fast) == JSONProvider(app).loads(stdlib)
+    assert list(OrjsonProvider(app).loads(fast)) == ["a", "b", "when"]
+    assert OrjsonProvider(app).loads(fast)["when"] == "Sun, 18 Oct 2026 12:00:00 GMT"
+
+
+# checks orjson writes non-ASCII text as UTF-8 where the stdlib provider escapes it
+def test_orjson_writes_non_ascii_as_utf8(app):
+    # Arrange
+    data = {"title": "Café"}
+
+    # Act
+    stdlib = JSONProvider(app).response(data)
+    fast = OrjsonProvider(app).response(data)
+
+    # Assert
+    assert stdlib.get_data() == b'{"title":"Caf\\u00e9"}\n'
+    assert fast.get_data() == '{"title":"Café"}\n'.encode()
+    assert stdlib.content_length - fast.content_length == 4
+    assert fast.get_json() == stdlib.get_json()
+
+
+# checks SQLAlchemy rows are written as objects by both providers
+@pytest.mark.parametrize("provider_class", [JSONProvider, OrjsonProvider])
+def test_rows_serialize_as_objects(app, one_card, provider_class):
+    # Arrange
+    rows = db.session.execute(db.select(Card.id, Card.message)).all()
+
+    # Act
+    response = provider_class(app).response(rows)
+
+    # Assert
+    assert response.mimetype == "application/json"
+    assert response.get_json() == [{"id": 1, "message": one_card.message}]
+
+
+# checks JSON_PROVIDER picks the provider and rejects unknown names
+def test_json_provider_config():
+    # Act
+    config = {"SQLALCHEMY_DATABASE_URI": "sqlite://"}
+    stdlib_app = create_app({**config, "JSON_PROVIDER": "stdlib"})
+    orjson_app = create_app({**config, "JSON_PROVIDER": "auto"})
+
+    # Assert
+    assert type(stdlib_app.json) is JSONProvider
+    assert type(orjson_app.json) is OrjsonProvider
+    with pytest.raises(ValueError):
+        create_app({**config, "JSON_PROVIDER": "simplejson"})
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import exc
+from app import create_app
+from app.db import db
+from app.pool import InstrumentedQueuePool, dispose_after_fork, engine_options
+
+
+@pytest.fixture
+def pooled_app(tmp_path):
+    # One pooled connection and one overflow connection, giving up after a second
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pool.db'}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {
+            "poolclass": InstrumentedQueuePool, "pool_size": 1, "max_overflow": 1, "pool_timeout": 1
+        },
+        "CACHE_BACKEND": "none"
+    })
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+# checks engine options come from the DB_* settings, and SQLite keeps its defaults
+def test_engine_options():
+    # Arrange
+    config = {
+        "DB_POOL_SIZE": 8, "DB_MAX_OVERFLOW": 2, "DB_POOL_TIMEOUT": 5, "DB_POOL_RECYCLE": 600,
+        "DB_POOL_PRE_PING": True, "DB_STATEMENT_TIMEOUT_MS": 3000
+    }
+
+    # Act
+    postgres = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "postgresql://user@localhost/board"})
+    sqlite = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "sqlite:///board.db"})
+
+    # Assert
+    assert postgres == {
+        "poolclass": InstrumentedQueuePool, "pool_size": 8, "max_overflow": 2, "pool_timeout": 5,
+        "pool_recycle": 600, "pool_pre_ping": True,
+        "connect_args": {"options": "-c statement_timeout=3000"}
+    }
+    assert sqlite == {}
+
+
+# checks the pool reports in-use connections, overflow connections and timed out checkouts
+def test_pool_metrics_overflow_and_timeout(pooled_app):
+    # Arrange
+    metrics = pooled_app.extensions["pool_metrics"]
+    with pooled_app.app_context():
+        engine = db.engine
+    first = engine.connect()
+    second = engine.connect()
+
+    # Act
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    in_use = metrics.in_use
+    first.close()
+    second.close()
+    snapshot = metrics.snapshot(engine.pool)
+
+    # Assert
+    assert in_use == 2
+    assert snapshot["in_use"] == 0
+    assert snapshot["max_in_use"] == 2
+    assert snapshot["overflow_connections"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait_ms"]["count"] == 3
+    assert snapshot["checkout_wait_ms"]["max"] >= 1000
+    assert snapshot["checkout_wait_ms"]["buckets"]["+Inf"] == 3
+
+
+# checks GET /metrics returns the pool counters of this worker
+def test_get_metrics(pooled_app):
+    # Arrange
+    client = pooled_app.test_client()
+    with pooled_app.app_context():
+        db.create_all()
+    client.get("/boards")
+
+    # Act
+    response = client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    pool = response.get_json()["pool"]
+    assert pool["pool_class"] == "InstrumentedQueuePool"
+    assert pool["size"] == 1
+    assert pool["checkouts"] >= 1
+    assert pool["in_use"] == 0
+
+
+# checks a forked worker gets a fresh pool while connections it inherited stay open for the parent
+def test_dispose_after_fork(pooled_app):
+    # Arrange
+    with pooled_app.app_context():
+        engine = db.engine
+    connection = engine.connect()
+    inherited_pool = engine.pool
+
+    # Act
+    dispose_after_fork(pooled_app)
+
+    # Assert
+    assert engine.pool is not inherited_pool
+    assert engine.pool.metrics is inherited_pool.metrics
+    assert connection.exec_driver_sql("SELECT 1").scalar() == 1
+    connection.close()
@@ -0,0 +1,84 @@
+import logging
+import os
+import pytest
+from app import create_app
+from app.db import db
+from app.models.board import Board
+from app.profiler import query_budget
+
+
+@pytest.fixture
+def profiled_app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": os.environ.get('SQLALCHEMY_TEST_DATABASE_URI'),
+        "CACHE_BACKEND": "none",
+        "QUERY_PROFILING": True,
+        "SLOW_REQUEST_MS": 0
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add(Board(title="Inspiration", owner="Ada"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+# checks responses report their query count and database time in Server-Timing
+def test_server_timing_header(profiled_app):
+    # Arrange
+    client = profiled_app.test_client()
+
+    # Act
+    response = client.get("/boards/1/cards")
+    search_response = client.get("/search?q=inspiration")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    assert ", app;dur=" in response.headers["Server-Timing"]
+    # The search route's own timing is kept
+    assert search_response.headers["Server-Timing"].startswith("search;dur=")
+    assert ", db;dur=" in search_response.headers["Server-Timing"]
+
+
+# checks requests over SLOW_REQUEST_MS are logged with their slowest statements
+def test_slow_request_log(profiled_app, caplog):
+    # Arrange
+    client = profiled_app.test_client()
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger=profiled_app.logger.name):
+        client.get("/boards?limit=5")
+
+    # Assert
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith("Slow request GET /boards?limit=5: ")
+    assert "1 queries" in messages[0]
+    assert "FROM board" in messages[0]
+
+
+# checks responses have no Server-Timing header when profiling is off
+def test_profiling_off_by_default(client, one_board):
+    # Act
+    response = client.get("/boards")
+
+    # Assert
+    assert "Server-Timing" not in response.headers
+
+
+# checks query_budget fails a block that sends more statements than declared
+def test_query_budget(client, one_board):
+    # Act
+    with query_budget(1) as profile:
+        client.get("/boards")
+
+    with pytest.raises(AssertionError, match="2 queries over a budget of 1"):
+        with query_budget(1):
+            client.get("/boards/1/cards")
+
+    # Assert
+    assert profile.count == 1
@@ -0,0 +1,127 @@
+import pytest
+import time
+from app import create_app
+from app.db import db
+from app.models.board import Board
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    apps = []
+
+    def make(replica_uri, cache_backend="none"):
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_REPLICA_URIS": [replica_uri],
+            "CACHE_BACKEND": cache_backend
+        })
+        with app.app_context():
+            db.create_all(bind_key=None)
+            db.session.add(Board(title="On the primary", owner="Ada"))
+            db.session.commit()
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+    # init_app registers a metadata per bind on the shared db; other tests' create_all would visit it
+    db.metadatas.pop("replica_0", None)
+
+
+def make_replica_app(make_app, tmp_path, cache_backend="none"):
+    # Two SQLite files stand in for a primary and a lagging replica
+    app = make_app(f"sqlite:///{tmp_path / 'replica.db'}", cache_backend)
+    with app.app_context():
+        db.metadata.create_all(db.engines["replica_0"])
+    return app
+
+
+@pytest.fixture
+def replica_app(make_app, tmp_path):
+    return make_replica_app(make_app, tmp_path)
+
+
+# checks GET requests read from the replica, which doesn't have the primary's rows yet
+def test_get_reads_from_replica(replica_app):
+    # Arrange
+    client = replica_app.test_client()
+
+    # Act
+    response = client.get("/boards")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert replica_app.extensions["replicas"].status()[0]["reads"] == 1
+
+
+# checks a client that echoes Read-Primary-Until after a write reads its own write from the primary
+def test_reads_stick_to_primary_after_write(replica_app):
+    # Arrange
+    client = replica_app.test_client()
+
+    # Act
+    post_response = client.post("/boards", json={"title": "New", "owner": "Grace"})
+    until = post_response.headers["Read-Primary-Until"]
+    sticky = client.get("/boards", headers={"Read-Primary-Until": until})
+    too_far = client.get("/boards", headers={"Read-Primary-Until": str(time.time() + 3600)})
+    other_client = client.get("/boards")
+
+    # Assert
+    assert post_response.status_code == 201
+    assert "Read-Primary-Until" in post_response.headers["Access-Control-Expose-Headers"]
+    assert [board["title"] for board in sticky.get_json()] == ["On the primary", "New"]
+    assert too_far.get_json() == []
+    assert other_client.get_json() == []
+
+
+# checks responses rendered on a replica aren't cached, and a writer never reads a cached entry
+def test_replica_reads_are_not_cached(make_app, tmp_path):
+    # Arrange
+    app = make_replica_app(make_app, tmp_path, cache_backend="memory")
+    client = app.test_client()
+    client.get("/boards")
+
+    # Act
+    replica_read = client.get("/boards")
+    until = client.post("/boards", json={"title": "New", "owner": "Grace"}).headers["Read-Primary-Until"]
+    sticky_reads = [client.get("/boards", headers={"Read-Primary-Until": until}) for _ in range(2)]
+
+    # Assert
+    assert replica_read.headers["X-Cache"] == "MISS"
+    assert [response.headers["X-Cache"] for response in sticky_reads] == ["MISS", "MISS"]
+    assert [board["title"] for board in sticky_reads[1].get_json()] == ["On the primary", "New"]
+
+
+# checks a replica that can't be reached is marked unhealthy and the read is served by the primary
+def test_unreachable_replica_fails_over_to_primary(make_app, tmp_path):
+    # Arrange
+    app = make_app(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    client = app.test_client()
+
+    # Act
+    response = client.get("/boards")
+    metrics = client.get("/metrics").get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert [board["title"] for board in response.get_json()] == ["On the primary"]
+    assert metrics["replicas"][0]["healthy"] is False
+    assert app.extensions["replicas"].pick() is None
+
+
+# checks an error that isn't a lost connection, e.g. a missing table, is not retried on the primary
+def test_replica_query_errors_do_not_fail_over(make_app, tmp_path):
+    # Arrange
+    app = make_app(f"sqlite:///{tmp_path / 'empty_replica.db'}")
+    client = app.test_client()
+
+    # Act
+    response = client.get("/boards")
+
+    # Assert
+    assert response.status_code == 500
+    assert app.extensions["replicas"].status()[0]["healthy"] is True
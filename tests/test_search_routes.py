@@ -0,0 +1,96 @@
+from app.db import db
+from app.models.board import Board
+from app.models.card import Card
+
+
+def create_search_data():
+    db.session.add_all([
+        Board(title="Garden ideas", owner="Ada"),
+        Board(title="Reading list", owner="Grace"),
+        Card(message="Water the garden", board=Board(title="Chores", owner="Ada")),
+        Card(message="Garden garden garden", board_id=1),
+        Card(message="Read a book", board_id=2)
+    ])
+    db.session.commit()
+
+
+# checks GET /search returns ranked boards and cards matching every word
+def test_search_boards_and_cards(client):
+    # Arrange
+    create_search_data()
+
+    # Act
+    response = client.get("/search?q=garden")
+
+    # Assert
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["query"] == "garden"
+    assert [board["title"] for board in data["boards"]] == ["Garden ideas"]
+    assert [card["message"] for card in data["cards"]] == ["Garden garden garden", "Water the garden"]
+    assert data["cards"][0]["rank"] > data["cards"][1]["rank"]
+
+
+# checks GET /search matches board owners and can be limited to one type
+def test_search_by_owner_only_boards(client):
+    # Arrange
+    create_search_data()
+
+    # Act
+    response = client.get("/search?q=ada&type=boards")
+
+    # Assert
+    data = response.get_json()
+    assert sorted(board["title"] for board in data["boards"]) == ["Chores", "Garden ideas"]
+    assert "cards" not in data
+
+
+# checks GET /search pages through hits with limit and offset
+def test_search_paginated(client):
+    # Arrange
+    create_search_data()
+
+    # Act
+    first = client.get("/search?q=garden&type=cards&limit=1").get_json()
+    second = client.get("/search?q=garden&type=cards&limit=1&offset=1").get_json()
+
+    # Assert
+    assert [card["message"] for card in first["cards"]] == ["Garden garden garden"]
+    assert [card["message"] for card in second["cards"]] == ["Water the garden"]
+
+
+# checks the search index follows card updates and deletes
+def test_search_reflects_changes(client):
+    # Arrange
+    create_search_data()
+    client.put("/cards/1", json={"message": "Water the plants"})
+    client.delete("/cards/2")
+
+    # Act
+    garden = client.get("/search?q=garden&type=cards").get_json()
+    plants = client.get("/search?q=plants&type=cards").get_json()
+
+    # Assert
+    assert garden["cards"] == []
+    assert [card["id"] for card in plants["cards"]] == [1]
+
+
+# checks GET /search reports the search time in a Server-Timing header
+def test_search_server_timing_header(client):
+    # Act
+    response = client.get("/search?q=anything")
+
+    # Assert
+    assert response.headers["Server-Timing"].startswith("search;dur=")
+
+
+# checks GET /search requires q and ignores FTS syntax in user input
+def test_search_input_validation(client):
+    # Act
+    missing = client.get("/search")
+    syntax = client.get('/search?q="garden" OR NEAR(')
+
+    # Assert
+    assert missing.status_code == 400
+    assert missing.get_json() == {"message": "Query parameter q is required"}
+    assert syntax.status_code == 200